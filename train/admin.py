@@ -8,7 +8,9 @@ from train.models import (
     Crew,
     Order,
     Trip,
-    Ticket
+    Ticket,
+    SeatHold,
+    Job,
 )
 
 admin.site.register(TrainType)
@@ -19,3 +21,5 @@ admin.site.register(Ticket)
 admin.site.register(Station)
 admin.site.register(Crew)
 admin.site.register(Route)
+admin.site.register(SeatHold)
+admin.site.register(Job)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TrainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "train"
+
+    def ready(self) -> None:
+        import train.signals  # noqa: F401
@@ -0,0 +1,171 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import (
+    APIException,
+    NotAuthenticated,
+    NotFound,
+    Throttled,
+)
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from user.authentication import CachedJWTAuthentication
+from train.filters import filter_routes, filter_trips
+from train.models import Route, Trip
+from train.pagination import KeysetPagination
+from train.replicas import is_pinned, pin_primary, read_from_replica
+from train.serializers import (
+    RouteListSerializer,
+    OrderSerializer,
+    TripListSerializer,
+    TripRetrieveSerializer,
+)
+
+
+class AsyncAPIView(View):
+    """Base for the native async endpoints.
+
+    DRF views are sync only, so these are plain Django async views served
+    through ``asgi.py``. They reuse the DRF serializers, filters and
+    pagination of the sync API and render DRF exceptions the same way.
+    Safe requests of ``replica_reads`` views go to a replica unless the
+    client carries the primary pin cookie. The API throttles apply as in
+    the sync views, with ``throttle_scope`` and ``throttle_costs`` keyed
+    by the lowercase HTTP method.
+    """
+
+    replica_reads = False
+    authentication_classes = ()
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.drf_request = Request(
+            request,
+            parsers=[JSONParser()],
+            authenticators=[auth() for auth in self.authentication_classes],
+        )
+        token = read_from_replica.set(
+            self.replica_reads
+            and request.method in SAFE_METHODS
+            and not await sync_to_async(is_pinned)(self.drf_request)
+        )
+        try:
+            await sync_to_async(self.check_throttles)()
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:
+            detail = exc.detail
+            if not isinstance(detail, (list, dict)):
+                detail = {"detail": detail}
+            response = JsonResponse(
+                detail, status=exc.status_code, safe=False
+            )
+            if getattr(exc, "wait", None):
+                response["Retry-After"] = "%d" % exc.wait
+            return response
+        finally:
+            read_from_replica.reset(token)
+
+    def check_throttles(self) -> None:
+        """``APIView.check_throttles``, run in a sync hop because the user
+        throttle may authenticate the request."""
+        waits = [
+            throttle.wait()
+            for throttle in (cls() for cls in self.throttle_classes)
+            if not throttle.allow_request(self.drf_request, self)
+        ]
+        if waits:
+            raise Throttled(
+                max((wait for wait in waits if wait is not None), default=None)
+            )
+
+
+class AsyncTripListView(AsyncAPIView):
+    replica_reads = True
+    cursor_ordering = ("departure_time", "id")
+
+    async def get(self, request) -> JsonResponse:
+        queryset = filter_trips(
+            Trip.objects.select_related("route", "train__train_type"),
+            self.drf_request.query_params,
+        )
+        paginator = KeysetPagination()
+        page = paginator.get_page_queryset(queryset, self.drf_request, self)
+        paginator.set_page([trip async for trip in page])
+
+        serializer = TripListSerializer(paginator.page, many=True)
+        return JsonResponse(
+            paginator.get_paginated_response(serializer.data).data
+        )
+
+
+class AsyncTripDetailView(AsyncAPIView):
+    replica_reads = True
+
+    async def get(self, request, pk) -> JsonResponse:
+        trip = await (
+            Trip.objects.select_related("route", "train__train_type")
+            .filter(pk=pk)
+            .afirst()
+        )
+        if trip is None:
+            raise NotFound()
+        # Held seats are read with a query while serializing.
+        data = await sync_to_async(
+            lambda: TripRetrieveSerializer(trip).data
+        )()
+        return JsonResponse(data)
+
+
+class AsyncRouteListView(AsyncAPIView):
+    replica_reads = True
+    cursor_ordering = ("name", "id")
+
+    async def get(self, request) -> JsonResponse:
+        # The station name filter may load the station index.
+        queryset = await sync_to_async(filter_routes)(
+            Route.objects.select_related("source", "destination"),
+            self.drf_request.query_params,
+        )
+        paginator = KeysetPagination()
+        page = paginator.get_page_queryset(queryset, self.drf_request, self)
+        paginator.set_page([route async for route in page])
+
+        serializer = RouteListSerializer(paginator.page, many=True)
+        return JsonResponse(
+            paginator.get_paginated_response(serializer.data).data
+        )
+
+
+class AsyncOrderCreateView(AsyncAPIView):
+    authentication_classes = (CachedJWTAuthentication,)
+    throttle_scope = "booking"
+    throttle_costs = {"post": 5}
+
+    async def post(self, request) -> JsonResponse:
+        user = await sync_to_async(lambda: self.drf_request.user)()
+        if not user.is_authenticated:
+            raise NotAuthenticated()
+
+        data = await sync_to_async(self.create_order)(user)
+        response = JsonResponse(data, status=201)
+        await sync_to_async(pin_primary)(self.drf_request, response)
+        return response
+
+    def create_order(self, user) -> dict:
+        """Validate and book in one sync hop, the async ORM has no
+        transactions yet."""
+        serializer = OrderSerializer(
+            data=self.drf_request.data, context={"request": self.drf_request}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=user)
+        return serializer.data
@@ -0,0 +1,74 @@
+import hashlib
+import time
+import uuid
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from train.replicas import read_from_replica
+
+STATIONS = "stations"
+ROUTES = "routes"
+
+
+def get_catalog_state(catalog) -> tuple[str, int]:
+    """Return ``(version, last modified timestamp)`` of a catalog."""
+    return cache.get_or_set(
+        f"catalog:{catalog}:state",
+        lambda: (uuid.uuid4().hex, int(time.time())),
+        timeout=None,
+    )
+
+
+def touch_catalog(*catalogs) -> None:
+    for catalog in catalogs:
+        cache.set(
+            f"catalog:{catalog}:state",
+            (uuid.uuid4().hex, int(time.time())),
+            timeout=None,
+        )
+
+
+class CatalogCacheMixin:
+    """Serve ``list`` from the cache with ETag/Last-Modified revalidation.
+
+    Cached pages are keyed on the catalog version, which the model signals
+    replace on every write, so stale entries are never served and clients
+    holding the current ETag get a 304. Pages are filled from the primary,
+    a lagging replica would store old rows under the new version.
+    """
+
+    catalog = None
+    catalog_cache_timeout = 60 * 60
+
+    def list(self, request, *args, **kwargs) -> Response:
+        version, last_modified = get_catalog_state(self.catalog)
+        url = request.build_absolute_uri()
+        digest = hashlib.md5(f"{version}:{url}".encode()).hexdigest()
+        headers = {
+            "ETag": quote_etag(digest),
+            "Last-Modified": http_date(last_modified),
+            "Cache-Control": "no-cache",
+        }
+
+        not_modified = get_conditional_response(
+            request, etag=headers["ETag"], last_modified=last_modified
+        )
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+
+        key = f"catalog:{self.catalog}:{digest}"
+        data = cache.get(key)
+        if data is None:
+            token = read_from_replica.set(False)
+            try:
+                data = super().list(request, *args, **kwargs).data
+            finally:
+                read_from_replica.reset(token)
+            cache.set(key, data, self.catalog_cache_timeout)
+
+        return Response(data, headers=headers)
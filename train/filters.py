@@ -0,0 +1,108 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+from train.search import station_index
+
+
+def day_bounds(value, param) -> tuple[datetime, datetime]:
+    """Start of the local day ``value`` and of the day after it."""
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({param: ["Expected a date as YYYY-MM-DD."]})
+
+    return (
+        timezone.make_aware(datetime.combine(day, time.min)),
+        timezone.make_aware(
+            datetime.combine(day + timedelta(days=1), time.min)
+        ),
+    )
+
+
+def filter_day(queryset, field, value, param) -> QuerySet:
+    """Range filter on one local day, unlike ``__date`` it can use an
+    index on ``field``."""
+    start, end = day_bounds(value, param)
+    return queryset.filter(**{f"{field}__gte": start, f"{field}__lt": end})
+
+
+def filter_timetable(queryset, params) -> QuerySet:
+    """Trips departing between the ``from`` and ``to`` dates, inclusive."""
+    if params.get("from"):
+        start, _ = day_bounds(params["from"], "from")
+        queryset = queryset.filter(departure_time__gte=start)
+
+    if params.get("to"):
+        _, end = day_bounds(params["to"], "to")
+        queryset = queryset.filter(departure_time__lt=end)
+
+    return queryset
+
+
+def filter_station(queryset, field, name, match) -> QuerySet:
+    if match == "prefix":
+        station_ids = station_index.prefix(name)
+    elif match == "substring":
+        station_ids = station_index.substring(name)
+    elif match:
+        raise ValidationError(
+            {"match": ["Expected one of: prefix, substring."]}
+        )
+    else:
+        return queryset.filter(**{f"{field}__name__icontains": name})
+
+    return queryset.filter(**{f"{field}__in": station_ids})
+
+
+def filter_routes(queryset, params) -> QuerySet:
+    source = params.get("source")
+    destination = params.get("destination")
+    match = params.get("match")
+
+    if source:
+        queryset = filter_station(queryset, "source", source, match)
+
+    if destination:
+        queryset = filter_station(queryset, "destination", destination, match)
+
+    return queryset
+
+
+def filter_trips(queryset, params) -> QuerySet:
+    departure = params.get("departure")
+    arrival = params.get("arrival")
+    route = params.get("route")
+    min_seats = params.get("min_seats")
+    ordering = params.get("ordering")
+
+    if departure:
+        queryset = filter_day(
+            queryset, "departure_time", departure, "departure"
+        )
+
+    if arrival:
+        queryset = filter_day(queryset, "arrival_time", arrival, "arrival")
+
+    if route:
+        queryset = queryset.filter(route__name__icontains=route)
+
+    if min_seats:
+        try:
+            queryset = queryset.filter(available_seats__gte=int(min_seats))
+        except ValueError:
+            raise ValidationError(
+                {"min_seats": ["A valid integer is required."]}
+            )
+
+    if ordering:
+        if ordering.lstrip("-") != "available_seats":
+            raise ValidationError({"ordering": ["Expected available_seats."]})
+        queryset = queryset.order_by(ordering, "departure_time")
+
+    return queryset
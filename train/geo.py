@@ -0,0 +1,79 @@
+from threading import RLock
+
+import numpy as np
+
+from train.catalog import get_catalog_state, STATIONS
+from train.models import Station
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat, lon, lats, lons) -> np.ndarray:
+    """Great-circle distances from one point to arrays of points, radians."""
+    a = (
+        np.sin((lats - lat) / 2) ** 2
+        + np.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class StationLocator:
+    """Per-process spatial index of station coordinates.
+
+    Coordinates are kept as numpy arrays sorted by latitude. A query
+    binary-searches the latitude band that can hold stations within the
+    radius and computes haversine distances for that band in one
+    vectorized pass. The index is rebuilt with a single query when the
+    stations catalog version, which a station write in any worker
+    replaces, has changed. The new arrays replace the old ones only once
+    they are complete.
+    """
+
+    def __init__(self) -> None:
+        self.lock = RLock()
+        self.version = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.lats = np.empty(0)
+        self.lons = np.empty(0)
+
+    def ensure_loaded(self) -> None:
+        # Read before the rows, a write during the load changes the
+        # version again and the next lookup reloads.
+        version, _ = get_catalog_state(STATIONS)
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            rows = np.array(
+                Station.objects.values_list("id", "latitude", "longitude"),
+                dtype=float,
+            ).reshape(-1, 3)
+            order = np.argsort(rows[:, 1], kind="stable")
+            ids = rows[order, 0].astype(np.int64)
+            lats = np.radians(rows[order, 1])
+            lons = np.radians(rows[order, 2])
+
+            self.ids, self.lats, self.lons = ids, lats, lons
+            self.version = version
+
+    def nearby(self, latitude, longitude, radius_km, limit) -> list[tuple]:
+        """``(station id, distance km)`` pairs within radius, closest first."""
+        self.ensure_loaded()
+        with self.lock:
+            ids, lats, lons = self.ids, self.lats, self.lons
+
+        lat, lon = np.radians(latitude), np.radians(longitude)
+        band = radius_km / EARTH_RADIUS_KM
+        start, stop = np.searchsorted(lats, [lat - band, lat + band])
+        distances = haversine_km(lat, lon, lats[start:stop], lons[start:stop])
+
+        within = np.flatnonzero(distances <= radius_km)
+        closest = within[np.argsort(distances[within], kind="stable")][:limit]
+        return [
+            (int(ids[start + index]), float(distances[index]))
+            for index in closest
+        ]
+
+
+station_locator = StationLocator()
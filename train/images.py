@@ -0,0 +1,122 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageOps
+
+from train.catalog import touch_catalog, STATIONS
+from train.models import Station
+from train.references import stations
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes of the thumbnails, images are never scaled up.
+SIZES = {"small": (160, 120), "medium": (640, 480), "large": (1280, 960)}
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpeg": {"format": "JPEG", "quality": 85, "optimize": True},
+    "png": {"format": "PNG", "optimize": True},
+}
+
+# Pillow releases the GIL while decoding and resizing, threads are enough
+# to keep the work off the request.
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS, thread_name_prefix="station-images"
+)
+
+
+def variants_ready(station) -> bool:
+    return bool(
+        station.image
+        and station.image_variants.get("source") == station.image.name
+    )
+
+
+def render_variants(file) -> dict[str, dict[str, bytes]]:
+    """Encoded thumbnails by size and format.
+
+    Every size comes as WebP and as JPEG, or PNG for images with
+    transparency, for clients without WebP support.
+    """
+    with Image.open(file) as original:
+        original = ImageOps.exif_transpose(original)
+        transparent = (
+            original.mode in ("RGBA", "LA", "PA")
+            or "transparency" in original.info
+        )
+        original = original.convert("RGBA" if transparent else "RGB")
+
+        rendered = {}
+        for size, box in SIZES.items():
+            image = original.copy()
+            image.thumbnail(box, Image.Resampling.LANCZOS)
+            rendered[size] = {}
+            for output in ("webp", "png" if transparent else "jpeg"):
+                buffer = BytesIO()
+                image.save(buffer, **SAVE_OPTIONS[output])
+                rendered[size][output] = buffer.getvalue()
+        return rendered
+
+
+def generate_variants(station_id, name) -> bool:
+    """Write the thumbnails of image ``name`` and record them on the station.
+
+    Nothing is recorded if the station got another image meanwhile.
+    Thumbnails of the previous image are deleted.
+    """
+    with default_storage.open(name) as file:
+        rendered = render_variants(file)
+
+    stem = os.path.splitext(name)[0]
+    sizes = {
+        size: {
+            output: default_storage.save(
+                f"{stem}-{size}.{output}", ContentFile(content)
+            )
+            for output, content in outputs.items()
+        }
+        for size, outputs in rendered.items()
+    }
+    written = [path for outputs in sizes.values() for path in outputs.values()]
+
+    previous = (
+        Station.objects.filter(pk=station_id)
+        .values_list("image_variants", flat=True)
+        .first()
+    )
+    updated = Station.objects.filter(pk=station_id, image=name).update(
+        image_variants={"source": name, "sizes": sizes}
+    )
+    if not updated:
+        for path in written:
+            default_storage.delete(path)
+        return False
+
+    for outputs in (previous or {}).get("sizes", {}).values():
+        for path in outputs.values():
+            if path not in written:
+                default_storage.delete(path)
+    # ``update`` skips the model signals.
+    touch_catalog(STATIONS)
+    stations.invalidate()
+    return True
+
+
+def run_generate_variants(station_id, name) -> None:
+    try:
+        generate_variants(station_id, name)
+    except Exception:
+        logger.exception(
+            "Could not generate the images of station %s", station_id
+        )
+    finally:
+        connections.close_all()
+
+
+def schedule_variants(station_id, name) -> None:
+    executor.submit(run_generate_variants, station_id, name)
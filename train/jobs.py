@@ -0,0 +1,121 @@
+import logging
+import random
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from train.models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS = {}
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.JOB_WORKERS, thread_name_prefix="jobs"
+)
+
+
+def register(func):
+    """Make ``func`` a job, it is called with the payload as keywords."""
+    JOBS[func.__name__] = func
+    return func
+
+
+def enqueue(func, max_attempts=None, **payload) -> Job:
+    """Queue ``func(**payload)`` in the current transaction.
+
+    With ``JOB_RUN_IN_PROCESS`` the job starts in this process's pool once
+    the transaction commits. The ``run_jobs`` worker picks up everything
+    else: retries, jobs of other processes and jobs lost on a restart.
+    """
+    if JOBS.get(func.__name__) is not func:
+        raise ValueError(f"{func.__name__} is not a registered job.")
+    job = Job.objects.create(
+        name=func.__name__,
+        payload=payload,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    if settings.JOB_RUN_IN_PROCESS:
+        transaction.on_commit(partial(executor.submit, run_in_pool, job.id))
+    return job
+
+
+def claim(job_id) -> Job | None:
+    """Mark a due job as running, ``None`` if another worker was first."""
+    now = timezone.now()
+    claimed = Job.objects.filter(
+        pk=job_id, status=Job.PENDING, run_at__lte=now
+    ).update(status=Job.RUNNING, locked_at=now, attempts=F("attempts") + 1)
+    return Job.objects.filter(pk=job_id).first() if claimed else None
+
+
+def retry_delay(attempts) -> float:
+    """Seconds before the next attempt, doubled after every failure and
+    jittered so failed jobs do not retry in lockstep."""
+    delay = min(
+        settings.JOB_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOB_RETRY_MAX_DELAY,
+    )
+    return delay * random.uniform(0.5, 1)
+
+
+def run_job(job_id) -> bool | None:
+    """Run a due job once. Returns whether it succeeded, ``None`` if it
+    was not claimed."""
+    job = claim(job_id)
+    if job is None:
+        return None
+    # A stale job sweep may have handed the job to another worker.
+    claimed = Job.objects.filter(
+        pk=job.id, status=Job.RUNNING, locked_at=job.locked_at
+    )
+
+    try:
+        JOBS[job.name](**job.payload)
+    except Exception:
+        logger.exception("Job %s failed (attempt %s)", job, job.attempts)
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            claimed.update(
+                status=Job.PENDING,
+                run_at=now + timedelta(seconds=retry_delay(job.attempts)),
+                locked_at=None,
+                last_error=traceback.format_exc(),
+            )
+        else:
+            claimed.update(
+                status=Job.FAILED,
+                finished_at=now,
+                last_error=traceback.format_exc(),
+            )
+        return False
+
+    claimed.update(status=Job.DONE, finished_at=timezone.now())
+    return True
+
+
+def run_in_pool(job_id) -> bool | None:
+    try:
+        return run_job(job_id)
+    except Exception:
+        logger.exception("Could not run job #%s", job_id)
+    finally:
+        connections.close_all()
+
+
+def requeue_stale() -> int:
+    """Give jobs of dead workers another attempt, or fail them when they
+    are out of attempts."""
+    stale = Job.objects.stale()
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        finished_at=timezone.now(),
+        last_error="The worker running the job stopped.",
+    )
+    return failed + stale.update(status=Job.PENDING, locked_at=None)
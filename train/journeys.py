@@ -0,0 +1,200 @@
+import heapq
+from threading import RLock
+
+from train.catalog import get_catalog_state, ROUTES
+from train.models import Station, Route
+
+
+class RouteGraph:
+    """Per-process directed graph of stations connected by routes.
+
+    Stations are nodes, routes are edges weighted by ``distance``. The graph
+    is loaded from the database on first use and reloaded when the routes
+    catalog version, which station and route writes in any worker replace,
+    has changed, so searches on a warm graph never query the database.
+    """
+
+    def __init__(self) -> None:
+        self.lock = RLock()
+        self.version = None
+        self.stations = {}
+        self.station_ids = {}
+        self.routes = {}
+        self.edges = {}
+
+    def ensure_loaded(self) -> None:
+        # Read before the rows, a write during the load changes the
+        # version again and the next search reloads.
+        version, _ = get_catalog_state(ROUTES)
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            loaded = RouteGraph()
+            for station_id, name in Station.objects.values_list("id", "name"):
+                loaded.add_station(station_id, name)
+            routes = Route.objects.values_list(
+                "id", "name", "source_id", "destination_id", "distance"
+            )
+            for route in routes:
+                loaded.add_route(*route)
+            self.stations = loaded.stations
+            self.station_ids = loaded.station_ids
+            self.routes = loaded.routes
+            self.edges = loaded.edges
+            self.version = version
+
+    def add_station(self, station_id, name) -> None:
+        with self.lock:
+            previous = self.stations.get(station_id)
+            if previous is not None:
+                self.station_ids.pop(previous.casefold(), None)
+            self.stations[station_id] = name
+            self.station_ids[name.casefold()] = station_id
+
+    def remove_station(self, station_id) -> None:
+        with self.lock:
+            name = self.stations.pop(station_id, None)
+            if name is not None:
+                self.station_ids.pop(name.casefold(), None)
+
+    def add_route(
+        self, route_id, name, source_id, destination_id, distance
+    ) -> None:
+        with self.lock:
+            self.remove_route(route_id)
+            self.routes[route_id] = (name, source_id, destination_id, distance)
+            self.edges.setdefault(source_id, {})[route_id] = (
+                destination_id,
+                distance,
+            )
+
+    def remove_route(self, route_id) -> None:
+        with self.lock:
+            route = self.routes.pop(route_id, None)
+            if route is not None:
+                self.edges.get(route[1], {}).pop(route_id, None)
+
+    def find_station(self, value) -> int | None:
+        """Resolve a station by id or by case-insensitive exact name."""
+        self.ensure_loaded()
+        value = value.strip()
+        if value.isdigit() and int(value) in self.stations:
+            return int(value)
+        return self.station_ids.get(value.casefold())
+
+    def shortest_path(self, source_id, destination_id) -> tuple | None:
+        """``(distance, route ids)`` of the shortest journey or ``None``."""
+        self.ensure_loaded()
+        return self.search(source_id, destination_id)
+
+    def search(
+        self,
+        source_id,
+        destination_id,
+        banned_routes=frozenset(),
+        banned_stations=frozenset(),
+    ) -> tuple[int, list] | None:
+        """Dijkstra search on the loaded graph, returns ``(distance, route
+        ids)`` or ``None``."""
+        distances = {source_id: 0}
+        previous = {}
+        queue = [(0, source_id)]
+
+        while queue:
+            distance, station_id = heapq.heappop(queue)
+            if station_id == destination_id:
+                break
+            if distance > distances[station_id]:
+                continue
+            for route_id, (next_id, length) in self.edges.get(
+                station_id, {}
+            ).items():
+                if route_id in banned_routes or next_id in banned_stations:
+                    continue
+                candidate = distance + length
+                if candidate < distances.get(next_id, candidate + 1):
+                    distances[next_id] = candidate
+                    previous[next_id] = (station_id, route_id)
+                    heapq.heappush(queue, (candidate, next_id))
+        else:
+            return None
+
+        path = []
+        station_id = destination_id
+        while station_id != source_id:
+            station_id, route_id = previous[station_id]
+            path.append(route_id)
+        path.reverse()
+        return distances[destination_id], path
+
+    def k_shortest_paths(self, source_id, destination_id, k) -> list:
+        """Yen's algorithm for the ``k`` shortest loop-free journeys."""
+        self.ensure_loaded()
+        # One search runs on one version of the graph.
+        with self.lock:
+            first = self.search(source_id, destination_id)
+            if first is None or source_id == destination_id:
+                return [first] if first else []
+
+            found = [first]
+            candidates = []
+            seen = {tuple(first[1])}
+
+            while len(found) < k:
+                last_path = found[-1][1]
+                stations = [source_id] + [
+                    self.routes[route_id][2] for route_id in last_path
+                ]
+                for index in range(len(last_path)):
+                    root = last_path[:index]
+                    banned_routes = {
+                        path[index]
+                        for _, path in found
+                        if path[:index] == root and len(path) > index
+                    }
+                    spur = self.search(
+                        stations[index],
+                        destination_id,
+                        banned_routes=banned_routes,
+                        banned_stations=set(stations[:index]),
+                    )
+                    if spur is None:
+                        continue
+                    path = root + spur[1]
+                    if tuple(path) in seen:
+                        continue
+                    seen.add(tuple(path))
+                    distance = sum(
+                        self.routes[route_id][3] for route_id in path
+                    )
+                    heapq.heappush(candidates, (distance, path))
+
+                if not candidates:
+                    break
+                found.append(heapq.heappop(candidates))
+
+            return found
+
+    def describe(self, distance, path) -> dict:
+        routes = []
+        for route_id in path:
+            name, source_id, destination_id, length = self.routes[route_id]
+            routes.append(
+                {
+                    "id": route_id,
+                    "name": name,
+                    "source": self.stations.get(source_id),
+                    "destination": self.stations.get(destination_id),
+                    "distance": length,
+                }
+            )
+        return {
+            "distance": distance,
+            "transfers": max(len(path) - 1, 0),
+            "routes": routes,
+        }
+
+
+route_graph = RouteGraph()
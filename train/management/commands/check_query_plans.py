@@ -0,0 +1,124 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from train.pagination import KeysetPagination
+from train.views import (
+    TrainViewSet,
+    RouteViewSet,
+    OrderViewSet,
+    TripViewSet,
+    SeatHoldViewSet,
+)
+
+FULL_SCAN_PATTERNS = {
+    "sqlite": re.compile(r"\bSCAN (\w+)$", re.MULTILINE),
+    "postgresql": re.compile(r"\bSeq Scan on (\w+)"),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the querysets behind the hot endpoints and fail "
+        "if any of them scans a whole table."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--database", default="default")
+
+    def get_hot_paths(self) -> list[tuple]:
+        """``(name, viewset, action, query params)`` of each checked path."""
+        today = timezone.localdate().isoformat()
+        return [
+            ("trip-list", TripViewSet, "list", {}),
+            (
+                "trip-list-cursor",
+                TripViewSet,
+                "list",
+                {"pagination": "cursor"},
+            ),
+            (
+                "trip-list-departure",
+                TripViewSet,
+                "list",
+                {"departure": today},
+            ),
+            (
+                "trip-list-seats",
+                TripViewSet,
+                "list",
+                {"ordering": "-available_seats"},
+            ),
+            ("trip-detail", TripViewSet, "retrieve", {}),
+            ("route-list", RouteViewSet, "list", {}),
+            ("train-list", TrainViewSet, "list", {}),
+            ("order-list", OrderViewSet, "list", {"pagination": "cursor"}),
+            ("seathold-list", SeatHoldViewSet, "list", {}),
+        ]
+
+    def get_queryset(self, viewset, action, params):
+        """The queryset the view would run for page one of ``params``."""
+        request = APIRequestFactory().get("/", params)
+        force_authenticate(request, user=get_user_model()(pk=1))
+
+        view = viewset(
+            action_map={"get": action}, format_kwarg=None, args=(), kwargs={}
+        )
+        view.request = view.initialize_request(request)
+        queryset = view.filter_queryset(view.get_queryset())
+
+        if action == "retrieve":
+            return queryset.filter(pk=1)
+        paginator = view.paginator
+        if isinstance(paginator, KeysetPagination):
+            return paginator.get_page_queryset(queryset, view.request, view)
+        if isinstance(paginator, PageNumberPagination):
+            return queryset[:paginator.page_size]
+        return queryset
+
+    def explain(self, queryset, database) -> str:
+        connection = connections[database]
+        with transaction.atomic(using=database):
+            if connection.vendor == "postgresql":
+                # Small tables are always cheaper to scan, make the planner
+                # fall back to a Seq Scan only when no index fits.
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.using(database).explain()
+
+    def handle(self, *args, **options) -> None:
+        database = options["database"]
+        vendor = connections[database].vendor
+        if vendor not in FULL_SCAN_PATTERNS:
+            raise CommandError(f"Query plans of {vendor} are not supported.")
+
+        failed = []
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for name, viewset, action, params in self.get_hot_paths():
+                plan = self.explain(
+                    self.get_queryset(viewset, action, params), database
+                )
+                scans = FULL_SCAN_PATTERNS[vendor].findall(plan)
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{name}:\n{plan}\n")
+                if scans:
+                    failed.append(name)
+                    self.stdout.write(
+                        self.style.ERROR(
+                            f"{name}: full scan of {', '.join(scans)}"
+                        )
+                    )
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"{name}: ok"))
+
+        if failed:
+            raise CommandError(
+                f"Full table scans on {len(failed)} hot paths: "
+                f"{', '.join(failed)}."
+            )
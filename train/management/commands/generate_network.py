@@ -0,0 +1,225 @@
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from train.models import (
+    TrainType,
+    Train,
+    Station,
+    Route,
+    Crew,
+    Order,
+    Trip,
+    Ticket,
+)
+from train.seat_map import SeatMap
+
+TRAIN_TYPES = ("Intercity", "Intercity+", "Regional", "Night", "Suburban")
+USER_PASSWORD = "benchmark"
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic train network for benchmarks. "
+        "Everything is written with bulk inserts, run it on an empty "
+        "database."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--stations", type=int, default=200)
+        parser.add_argument("--routes", type=int, default=1000)
+        parser.add_argument("--trains", type=int, default=100)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--trips-per-day", type=int, default=200)
+        parser.add_argument("--crews", type=int, default=500)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument(
+            "--tickets-per-order",
+            type=int,
+            default=3,
+            help="Upper bound of tickets in one order.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options) -> None:
+        if options["stations"] < 2 or options["trains"] < 1:
+            raise CommandError("Need at least 2 stations and 1 train.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+
+        stations = self.create_stations(options["stations"])
+        routes = self.create_routes(stations, options["routes"])
+        trains = self.create_trains(options["trains"])
+        trips = self.create_trips(
+            routes, trains, options["days"], options["trips_per_day"]
+        )
+        self.create_crews(trips, options["crews"])
+        users = self.create_users(options["users"])
+        tickets = self.create_orders(
+            users, trips, options["orders"], options["tickets_per_order"]
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {len(stations)} stations, {len(routes)} routes, "
+                f"{len(trains)} trains, {len(trips)} trips, "
+                f"{len(users)} users, {options['orders']} orders and "
+                f"{tickets} tickets."
+            )
+        )
+
+    def bulk_create(self, model, objects) -> list:
+        created = []
+        for start in range(0, len(objects), self.batch_size):
+            created += model.objects.bulk_create(
+                objects[start:start + self.batch_size]
+            )
+        return created
+
+    def create_stations(self, count) -> list:
+        return self.bulk_create(
+            Station,
+            [
+                Station(
+                    name=f"Station {number}",
+                    latitude=round(self.rng.uniform(44.4, 52.3), 6),
+                    longitude=round(self.rng.uniform(22.1, 40.2), 6),
+                )
+                for number in range(1, count + 1)
+            ],
+        )
+
+    def create_routes(self, stations, count) -> list:
+        routes = []
+        for number in range(1, count + 1):
+            source, destination = self.rng.sample(stations, 2)
+            routes.append(
+                Route(
+                    name=f"{source.name} - {destination.name} #{number}",
+                    source=source,
+                    destination=destination,
+                    distance=self.rng.randint(30, 1200),
+                )
+            )
+        return self.bulk_create(Route, routes)
+
+    def create_trains(self, count) -> list:
+        train_types = self.bulk_create(
+            TrainType, [TrainType(name=name) for name in TRAIN_TYPES]
+        )
+        return self.bulk_create(
+            Train,
+            [
+                Train(
+                    name=f"Train {number}",
+                    luggage_space=self.rng.randint(20, 50),
+                    seats_num=self.rng.randint(50, 400),
+                    train_type=self.rng.choice(train_types),
+                )
+                for number in range(1, count + 1)
+            ],
+        )
+
+    def create_trips(self, routes, trains, days, trips_per_day) -> list:
+        start = timezone.make_aware(
+            datetime.combine(timezone.localdate(), time.min)
+        )
+        trips = []
+        for day in range(days):
+            for _ in range(trips_per_day):
+                route = self.rng.choice(routes)
+                train = self.rng.choice(trains)
+                departure = start + timedelta(
+                    days=day, minutes=self.rng.randint(0, 24 * 60 - 1)
+                )
+                trips.append(
+                    Trip(
+                        route=route,
+                        train=train,
+                        departure_time=departure,
+                        arrival_time=departure
+                        + timedelta(minutes=route.distance),
+                        available_seats=train.seats_num,
+                    )
+                )
+        return self.bulk_create(Trip, trips)
+
+    def create_crews(self, trips, count) -> None:
+        self.bulk_create(
+            Crew,
+            [
+                Crew(
+                    first_name=f"First{number}",
+                    last_name=f"Last{number}",
+                    assigned_trips=self.rng.choice(trips) if trips else None,
+                )
+                for number in range(1, count + 1)
+            ],
+        )
+
+    def create_users(self, count) -> list:
+        password = make_password(USER_PASSWORD)
+        return self.bulk_create(
+            get_user_model(),
+            [
+                get_user_model()(
+                    email=f"user{number}@benchmark.local", password=password
+                )
+                for number in range(1, count + 1)
+            ],
+        )
+
+    def create_orders(self, users, trips, count, tickets_per_order) -> int:
+        if not users or not trips:
+            return 0
+
+        sold = [0] * len(trips)
+        created = 0
+
+        for start in range(0, count, self.batch_size):
+            orders = Order.objects.bulk_create(
+                Order(user=self.rng.choice(users))
+                for _ in range(min(self.batch_size, count - start))
+            )
+            tickets = []
+            for order in orders:
+                index = self.rng.randrange(len(trips))
+                trip = trips[index]
+                booked = min(
+                    self.rng.randint(1, tickets_per_order),
+                    trip.train.seats_num - sold[index],
+                )
+                for seat in range(sold[index] + 1, sold[index] + booked + 1):
+                    tickets.append(
+                        Ticket(
+                            order=order,
+                            trip=trip,
+                            seat=seat,
+                            luggage_weight=self.rng.randint(
+                                0, trip.train.luggage_space
+                            ),
+                        )
+                    )
+                sold[index] += booked
+            Ticket.objects.bulk_create(tickets)
+            created += len(tickets)
+
+        for index, trip in enumerate(trips):
+            seat_map = SeatMap(size=trip.train.seats_num)
+            seat_map.bits = (1 << sold[index]) - 1
+            trip.seat_map = seat_map.to_bytes()
+            trip.sold_seats = sold[index]
+            trip.available_seats = seat_map.free_count()
+        Trip.objects.bulk_update(
+            trips,
+            ["seat_map", "sold_seats", "available_seats"],
+            batch_size=self.batch_size,
+        )
+        return created
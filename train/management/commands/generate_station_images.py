@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from train.images import generate_variants, variants_ready
+from train.models import Station
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the missing thumbnails of station images, or all of "
+        "them with --all."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--all", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        generated = 0
+        for station in Station.objects.exclude(image="").exclude(
+            image__isnull=True
+        ):
+            if options["all"] or not variants_ready(station):
+                generated += generate_variants(station.id, station.image.name)
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated images of {generated} stations.")
+        )
@@ -0,0 +1,56 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from train.timetable import FORMATS, TimetableImport, read_timetable
+
+
+class Command(BaseCommand):
+    help = (
+        "Import trips from a CSV or JSON timetable with route, train, "
+        "departure_time and arrival_time columns. Nothing is saved if any "
+        "row is invalid."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("path")
+        parser.add_argument(
+            "--format",
+            dest="input_format",
+            choices=FORMATS,
+            help="File format, taken from the extension by default.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the timetable without saving it.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        input_format = options["input_format"] or (
+            os.path.splitext(options["path"])[1].lstrip(".").lower()
+        )
+        try:
+            with open(options["path"], "rb") as file:
+                rows = read_timetable(file.read(), input_format)
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        timetable = TimetableImport(rows)
+        if not timetable.validate():
+            for error in timetable.report()["errors"]:
+                self.stderr.write(f"Row {error['row']}: {error['errors']}")
+            raise CommandError(
+                f"{len(timetable.errors)} of {len(rows)} rows are invalid, "
+                "nothing was imported."
+            )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(f"All {len(rows)} rows are valid.")
+            )
+            return
+
+        created = timetable.save(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Imported {created} trips."))
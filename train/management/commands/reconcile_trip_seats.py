@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from train.models import Trip, Ticket
+from train.seat_map import SeatMap
+
+
+class Command(BaseCommand):
+    help = "Recompute trip seat maps and sold seat counters from tickets."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of trips locked and repaired per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report drifted trips without saving them.",
+        )
+
+    def handle(self, *args, **options) -> None:
+        trips = (
+            Trip.objects.select_for_update(of=("self",))
+            .select_related("train")
+            .only(
+                "seat_map", "sold_seats", "available_seats", "train__seats_num"
+            )
+            .order_by("id")
+        )
+        checked = repaired = 0
+        last_id = 0
+
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    trips.filter(id__gt=last_id)[:options["batch_size"]]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+
+                seat_maps = {
+                    trip.id: SeatMap(size=trip.train.seats_num)
+                    for trip in batch
+                }
+                tickets = Ticket.objects.filter(
+                    trip_id__in=seat_maps
+                ).values_list("trip_id", "seat")
+                for trip_id, seat in tickets:
+                    seat_maps[trip_id].occupy([seat])
+
+                drifted = []
+                for trip in batch:
+                    seat_map = seat_maps[trip.id]
+                    if (
+                        SeatMap(trip.seat_map).bits != seat_map.bits
+                        or trip.sold_seats != len(seat_map)
+                        or trip.available_seats != seat_map.free_count()
+                    ):
+                        trip.seat_map = seat_map.to_bytes()
+                        trip.sold_seats = len(seat_map)
+                        trip.available_seats = seat_map.free_count()
+                        drifted.append(trip)
+
+                if drifted and not options["dry_run"]:
+                    Trip.objects.bulk_update(
+                        drifted, ["seat_map", "sold_seats", "available_seats"]
+                    )
+
+                checked += len(batch)
+                repaired += len(drifted)
+
+        action = "Found" if options["dry_run"] else "Repaired"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {checked} trips. {action} {repaired} drifted."
+            )
+        )
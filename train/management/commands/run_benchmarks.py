@@ -0,0 +1,230 @@
+import json
+import math
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from train.management.commands.generate_network import USER_PASSWORD
+from train.models import Station, Order, Trip
+from train.references import reference_stats
+from train.urls import router
+
+
+def percentile(samples, percent) -> float:
+    """Nearest-rank percentile of already sorted samples."""
+    rank = max(math.ceil(percent / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every train and user endpoint with the test client and "
+        "report latency percentiles, query counts and peak memory as JSON."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--output", help="Write the JSON report to this file."
+        )
+
+    def handle(self, *args, **options) -> None:
+        customer = (
+            get_user_model().objects.filter(orders__isnull=False).first()
+        )
+        trip = Trip.objects.order_by("id").first()
+        order = Order.objects.filter(user=customer).order_by("id").first()
+        if customer is None or trip is None:
+            raise CommandError(
+                "No data to benchmark, run generate_network first."
+            )
+
+        staff, _ = get_user_model().objects.get_or_create(
+            email="staff@benchmark.local",
+            defaults={"is_staff": True, "is_superuser": True},
+        )
+        self.tokens = {
+            False: str(RefreshToken.for_user(customer).access_token),
+            True: str(RefreshToken.for_user(staff).access_token),
+        }
+        self.samples = {
+            "trip": trip,
+            "order": order,
+            "stations": Station.objects.order_by("id")[:2],
+            "customer": customer,
+        }
+
+        results = []
+        # The daily anon/user throttles would reject most iterations.
+        with (
+            override_settings(ALLOWED_HOSTS=["testserver"]),
+            mock.patch.object(APIView, "throttle_classes", []),
+        ):
+            for scenario in self.get_scenarios():
+                results.append(self.measure(scenario, options))
+                self.stderr.write(
+                    f"{scenario['name']}: p50 {results[-1]['p50_ms']} ms"
+                )
+
+        report = {
+            "commit": self.get_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "iterations": options["iterations"],
+            "results": results,
+            "reference_cache": reference_stats(),
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def get_scenarios(self) -> list[dict]:
+        """One GET per router list, detail and extra action plus user URLs."""
+        params = {
+            "journey-list": {
+                "from": self.samples["stations"][0].id,
+                "to": self.samples["stations"][1].id,
+                "k": 3,
+            },
+            "station-autocomplete": {"q": "sta"},
+            "station-nearby": {"lat": 48.3, "lon": 31.1, "radius": 300},
+            "trip-list": {
+                "departure": self.samples["trip"].departure_time.date()
+            },
+        }
+        detail_pks = {
+            "trip": self.samples["trip"].pk,
+            "train": self.samples["trip"].train_id,
+            "order": getattr(self.samples["order"], "pk", None),
+        }
+
+        scenarios = []
+        for _, viewset, basename in router.registry:
+            staff = IsAdminUser in viewset.permission_classes
+            pk = detail_pks.get(basename)
+            actions = []
+            if hasattr(viewset, "list"):
+                actions.append(("list", False, staff))
+            if hasattr(viewset, "retrieve") and pk:
+                actions.append(("detail", True, staff))
+            actions += [
+                (
+                    extra.url_name,
+                    extra.detail,
+                    staff or IsAdminUser in extra.kwargs.get(
+                        "permission_classes", ()
+                    ),
+                )
+                for extra in viewset.get_extra_actions()
+                if "get" in extra.mapping and (pk or not extra.detail)
+            ]
+            for action, detail, action_staff in actions:
+                name = f"{basename}-{action}"
+                scenarios.append(
+                    {
+                        "name": name,
+                        "method": "get",
+                        "path": reverse(
+                            f"train:{name}", args=[pk] if detail else []
+                        ),
+                        "data": params.get(name, {}),
+                        "staff": action_staff,
+                    }
+                )
+
+        token_data = {
+            "email": self.samples["customer"].email,
+            "password": USER_PASSWORD,
+        }
+        scenarios += [
+            {
+                "name": "user-profile",
+                "method": "get",
+                "path": reverse("user:profile"),
+                "data": {},
+                "staff": False,
+            },
+            {
+                "name": "user-token",
+                "method": "post",
+                "path": reverse("user:token_obtain_pair"),
+                "data": token_data,
+                "staff": False,
+            },
+            {
+                "name": "user-token-verify",
+                "method": "post",
+                "path": reverse("user:token_verify"),
+                "data": {"token": self.tokens[False]},
+                "staff": False,
+            },
+        ]
+        return scenarios
+
+    def measure(self, scenario, options) -> dict:
+        client = Client(
+            HTTP_AUTHORIZATION=f"Bearer {self.tokens[scenario['staff']]}"
+        )
+        request = getattr(client, scenario["method"])
+
+        def call():
+            response = request(scenario["path"], scenario["data"])
+            if response.streaming:
+                b"".join(response.streaming_content)
+            return response
+
+        for _ in range(options["warmup"]):
+            call()
+
+        latencies = []
+        for _ in range(options["iterations"]):
+            started = time.perf_counter()
+            response = call()
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "name": scenario["name"],
+            "method": scenario["method"].upper(),
+            "path": scenario["path"],
+            "status": response.status_code,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "queries": len(queries),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    @staticmethod
+    def get_commit() -> str | None:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
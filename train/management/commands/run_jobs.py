@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from train.jobs import requeue_stale, run_in_pool
+from train.models import Job
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs, retrying failed ones with backoff. "
+        "Stops when the queue is empty with --once."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--workers", type=int, default=settings.JOB_WORKERS
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when no job is due.",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--once", action="store_true")
+
+    def handle(self, *args, **options) -> None:
+        results = {True: 0, False: 0, None: 0}
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while True:
+                requeue_stale()
+                due = list(
+                    Job.objects.due().values_list("id", flat=True)[
+                        :options["batch_size"]
+                    ]
+                )
+                for result in pool.map(run_in_pool, due):
+                    results[result] += 1
+                if due:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ran {results[True]} jobs, {results[False]} failed."
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from train.models import SeatHold
+
+
+class Command(BaseCommand):
+    help = "Delete expired seat holds."
+
+    def handle(self, *args, **options) -> None:
+        deleted, _ = SeatHold.objects.expired().delete()
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired seat holds.")
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:17
+
+from django.db import migrations, models
+
+from train.seat_map import SeatMap
+
+
+def fill_seat_maps(apps, schema_editor) -> None:
+    Trip = apps.get_model("train", "Trip")
+    Ticket = apps.get_model("train", "Ticket")
+
+    seat_maps = {}
+    for trip_id, seat in Ticket.objects.values_list("trip_id", "seat"):
+        seat_maps.setdefault(trip_id, SeatMap()).occupy([seat])
+
+    trips = Trip.objects.select_related("train").only("train__seats_num")
+    for trip in trips.iterator():
+        seat_map = seat_maps.get(trip.id, SeatMap())
+        seat_map.size = trip.train.seats_num
+        trip.seat_map = seat_map.to_bytes()
+        trip.save(update_fields=["seat_map"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0009_station_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="seat_map",
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(fill_seat_maps, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:22
+
+from django.db import migrations, models
+
+from train.seat_map import SeatMap
+
+
+def fill_sold_seats(apps, schema_editor) -> None:
+    Trip = apps.get_model("train", "Trip")
+
+    for trip in Trip.objects.only("seat_map").iterator():
+        trip.sold_seats = len(SeatMap(trip.seat_map))
+        trip.save(update_fields=["sold_seats"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0011_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="sold_seats",
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(fill_sold_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0013_seat_hold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["train", "departure_time", "arrival_time"],
+                name="trip_train_schedule_idx",
+            ),
+        ),
+    ]
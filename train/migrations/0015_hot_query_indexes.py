@@ -0,0 +1,32 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0014_trip_train_schedule_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(fields=["name", "id"], name="route_name_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(
+                fields=["source", "destination"], name="route_source_destination_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="seathold",
+            index=models.Index(
+                fields=["user", "expires_at"], name="seathold_user_expires_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="train",
+            index=models.Index(fields=["name"], name="train_name_idx"),
+        ),
+    ]
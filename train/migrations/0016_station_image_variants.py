@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-18 04:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0015_hot_query_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="station",
+            name="image_variants",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.4 on 2026-10-18 05:02
+
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+
+
+def fill_available_seats(apps, schema_editor) -> None:
+    Train = apps.get_model("train", "Train")
+    Trip = apps.get_model("train", "Trip")
+
+    seats_num = Train.objects.filter(pk=OuterRef("train_id")).values(
+        "seats_num"
+    )
+    Trip.objects.update(
+        available_seats=Greatest(Subquery(seats_num) - F("sold_seats"), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0017_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="trip",
+            name="available_seats",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_available_seats, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="trip",
+            name="sold_seats",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="trip",
+            index=models.Index(
+                fields=["available_seats", "departure_time"],
+                name="trip_available_departure_idx",
+            ),
+        ),
+    ]
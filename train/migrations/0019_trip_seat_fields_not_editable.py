@@ -0,0 +1,22 @@
+# Generated by Django 4.2.4 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0018_trip_available_seats"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="trip",
+            name="available_seats",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name="trip",
+            name="sold_seats",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
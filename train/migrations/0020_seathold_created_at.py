@@ -0,0 +1,21 @@
+# Generated by Django 4.2.4 on 2026-10-18 05:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("train", "0019_trip_seat_fields_not_editable"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="seathold",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
@@ -1,12 +1,17 @@
 import os
 import uuid
+from datetime import timedelta
 
 from rest_framework.exceptions import ValidationError
 
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 
+from train.seat_map import SeatMap
+
 
 class TrainType(models.Model):
     name = models.CharField(max_length=255)
@@ -25,6 +30,7 @@ class Train(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = [models.Index(fields=["name"], name="train_name_idx")]
 
     def __str__(self) -> str:
         return self.name
@@ -42,6 +48,8 @@ class Station(models.Model):
     latitude = models.FloatField()
     longitude = models.FloatField()
     image = models.ImageField(null=True, upload_to=station_image_file_path)
+    # Thumbnails of ``image`` written by ``train.images``
+    image_variants = models.JSONField(default=dict, editable=False)
 
     def __str__(self) -> str:
         return self.name
@@ -59,6 +67,13 @@ class Route(models.Model):
 
     class Meta:
         ordering = ("name",)
+        indexes = [
+            models.Index(fields=["name", "id"], name="route_name_id_idx"),
+            models.Index(
+                fields=["source", "destination"],
+                name="route_source_destination_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
@@ -83,11 +98,21 @@ class Order(models.Model):
 
     class Meta:
         ordering = ("created_at",)
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="order_user_created_id_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.user} ({self.created_at})"
 
 
+# Trip fields written by ``Trip.update_occupancy`` under the row lock
+SEAT_FIELDS = ("seat_map", "sold_seats", "available_seats")
+
+
 class Trip(models.Model):
     route = models.ForeignKey(
         Route,
@@ -101,13 +126,64 @@ class Trip(models.Model):
     )
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
+    seat_map = models.BinaryField(default=bytes, editable=False)
+    sold_seats = models.IntegerField(default=0, editable=False)
+    # ``train.seats_num - sold_seats`` stored for the indexed seat filter
+    available_seats = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("departure_time",)
+        indexes = [
+            models.Index(
+                fields=["available_seats", "departure_time"],
+                name="trip_available_departure_idx",
+            ),
+            models.Index(
+                fields=["departure_time", "id"],
+                name="trip_departure_id_idx",
+            ),
+            models.Index(
+                fields=["train", "departure_time", "arrival_time"],
+                name="trip_train_schedule_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.route} [{self.departure_time}]"
 
+    @property
+    def occupancy(self) -> SeatMap:
+        return SeatMap(self.seat_map, self.train.seats_num)
+
+    @property
+    def seats_taken(self) -> list[int]:
+        return self.occupancy.seats()
+
+    @property
+    def seats_held(self) -> list[int]:
+        return sorted(self.holds.active().values_list("seat", flat=True))
+
+    @staticmethod
+    def update_occupancy(trip_id, occupied=(), released=()) -> None:
+        with transaction.atomic():
+            trip = (
+                Trip.objects.select_for_update(of=("self",))
+                .select_related("train")
+                .only("seat_map", "train__seats_num")
+                .filter(pk=trip_id)
+                .first()
+            )
+            if trip is None:
+                return
+            seat_map = trip.occupancy
+            seat_map.release(released)
+            seat_map.occupy(occupied)
+            Trip.objects.filter(pk=trip_id).update(
+                seat_map=seat_map.to_bytes(),
+                sold_seats=len(seat_map),
+                available_seats=seat_map.free_count(),
+            )
+
     @staticmethod
     def validate_trip(departure, arrival, error_to_raise) -> None:
         if arrival <= departure:
@@ -115,6 +191,35 @@ class Trip(models.Model):
                 {"Arrival time must be greater than departure time."}
             )
 
+    def save(
+            self,
+            force_insert=False,
+            force_update=False,
+            using=None,
+            update_fields=None
+    ) -> None:
+        """Seat fields of an existing trip are only written by
+        ``update_occupancy``, a stale instance would undo bookings."""
+        if self._state.adding:
+            self.available_seats = self.occupancy.free_count()
+            return super(Trip, self).save(
+                force_insert, force_update, using, update_fields
+            )
+
+        if update_fields is None:
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in SEAT_FIELDS
+            ]
+        super(Trip, self).save(
+            force_insert, force_update, using, update_fields
+        )
+        if "train" in update_fields:
+            # Another train changes the number of free seats.
+            Trip.update_occupancy(self.pk)
+            self.refresh_from_db(fields=SEAT_FIELDS)
+
     def clean(self) -> None:
         Trip.validate_trip(
             departure=self.departure_time,
@@ -140,6 +245,13 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("trip", "seat")
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Ticket":
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance.loaded_seat = (loaded.get("trip_id"), loaded.get("seat"))
+        return instance
+
     @staticmethod
     def validate_ticket(seat, train, luggage_weight, error_to_raise) -> None:
         seats = train.seats_num
@@ -170,6 +282,114 @@ class Ticket(models.Model):
             update_fields=None
     ) -> None:
         self.full_clean()
-        return super(Ticket, self).save(
-            force_insert, force_update, using, update_fields
+        # The post_save signal updates the trip's seat counters, they
+        # commit or roll back together with the ticket.
+        with transaction.atomic(using=using):
+            return super(Ticket, self).save(
+                force_insert, force_update, using, update_fields
+            )
+
+
+class SeatHoldQuerySet(models.QuerySet):
+    def active(self) -> "SeatHoldQuerySet":
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self) -> "SeatHoldQuerySet":
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class SeatHold(models.Model):
+    """A seat reserved for one user until ``expires_at``.
+
+    Holding the seat again extends the hold, but never past
+    ``SEAT_HOLD_MAX_LIFETIME`` after ``created_at``. Expired holds are
+    ignored everywhere and deleted lazily when the seat is held again or by
+    the ``sweep_seat_holds`` command.
+    """
+
+    trip = models.ForeignKey(
+        Trip, on_delete=models.CASCADE, related_name="holds"
+    )
+    seat = models.IntegerField()
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="seat_holds"
+    )
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = SeatHoldQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("expires_at",)
+        unique_together = ("trip", "seat")
+        indexes = [
+            models.Index(
+                fields=["user", "expires_at"],
+                name="seathold_user_expires_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Seat: {self.seat}, {self.trip} until {self.expires_at}"
+
+    @staticmethod
+    def get_expiry():
+        return timezone.now() + timedelta(seconds=settings.SEAT_HOLD_TTL)
+
+
+class JobQuerySet(models.QuerySet):
+    def due(self) -> "JobQuerySet":
+        return self.filter(status=Job.PENDING, run_at__lte=timezone.now())
+
+    def stale(self) -> "JobQuerySet":
+        """Running jobs whose worker most likely died."""
+        return self.filter(
+            status=Job.RUNNING,
+            locked_at__lt=timezone.now()
+            - timedelta(seconds=settings.JOB_TIMEOUT),
         )
+
+
+class Job(models.Model):
+    """Background work queued by ``train.jobs.enqueue``.
+
+    Rows are written in the transaction of the request that queues them,
+    so a job exists exactly when the data it works on was committed.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    name = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField()
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("run_at",)
+        indexes = [
+            models.Index(
+                fields=["status", "run_at"], name="job_status_run_at_idx"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.id} ({self.status})"
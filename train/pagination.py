@@ -0,0 +1,139 @@
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    PageNumberPagination,
+    CursorPagination,
+    Cursor,
+)
+
+
+class StandardPagination(PageNumberPagination):
+    page_size = 10
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """Cursor pagination keyed on a ``(field, pk)`` pair.
+
+    Pages are fetched with ``WHERE (field, pk) > (value, last_pk)`` instead
+    of ``COUNT(*)`` plus ``OFFSET``, so the cost of a page does not grow with
+    its depth. The key comes from the view's ``cursor_ordering``.
+    """
+
+    page_size = 10
+    max_page_size = 100
+    mode_query_param = "pagination"
+
+    @classmethod
+    def is_requested(cls, request) -> bool:
+        params = request.query_params
+        return (
+            cls.cursor_query_param in params
+            or params.get(cls.mode_query_param) == "cursor"
+        )
+
+    def paginate_queryset(self, queryset, request, view=None) -> list:
+        return self.set_page(
+            list(self.get_page_queryset(queryset, request, view))
+        )
+
+    def get_page_queryset(self, queryset, request, view) -> QuerySet:
+        """Queryset of the requested page plus one row to detect more."""
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.field_name, self.pk_name = view.cursor_ordering
+        self.field = queryset.model._meta.get_field(self.field_name)
+        self.cursor = self.decode_cursor(request)
+
+        self.reverse = bool(self.cursor and self.cursor.reverse)
+        direction = "-" if self.reverse else ""
+        queryset = queryset.order_by(
+            direction + self.field_name, direction + self.pk_name
+        )
+
+        if self.cursor:
+            value, pk = self.decode_position(self.cursor.position)
+            lookup = "lt" if self.reverse else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field_name}__{lookup}": value})
+                | Q(
+                    **{
+                        self.field_name: value,
+                        f"{self.pk_name}__{lookup}": pk,
+                    }
+                )
+            )
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results) -> list:
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, bool(self.cursor)
+
+        return self.page
+
+    def encode_position(self, instance) -> str:
+        return json.dumps(
+            [
+                self.field.value_to_string(instance),
+                getattr(instance, self.pk_name),
+            ]
+        )
+
+    def decode_position(self, position) -> tuple:
+        try:
+            value, pk = json.loads(position)
+            return self.field.to_python(value), int(pk)
+        except (TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=False,
+                position=self.encode_position(self.page[-1]),
+            )
+        )
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(
+                offset=0,
+                reverse=True,
+                position=self.encode_position(self.page[0]),
+            )
+        )
+
+
+class KeysetPaginationMixin:
+    """Switch a viewset to ``KeysetPagination`` when the client asks for it.
+
+    Page-number pagination stays the default, ``?pagination=cursor`` starts
+    cursor mode and the returned ``cursor`` links keep it.
+    """
+
+    cursor_ordering = None
+
+    @property
+    def paginator(self):
+        if (
+            not hasattr(self, "_paginator")
+            and self.cursor_ordering
+            and KeysetPagination.is_requested(self.request)
+        ):
+            self._paginator = KeysetPagination()
+        return super().paginator
@@ -0,0 +1,162 @@
+import threading
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from train.models import TrainType, Train, Station, Route
+
+
+class ReferenceCache:
+    """Rows of a small, rarely written model behind two cache tiers.
+
+    Lookups go to a bounded LRU in the process first, then to the shared
+    cache and only then to the database. Entries of both tiers are keyed on
+    a version of the model that the model signals replace on every write.
+    The version lives in the shared cache (see ``CACHES``), so a save in
+    any worker retires the rows cached by all of them. It also expires
+    with the rows, which bounds how long a missed invalidation can last.
+    Misses read the primary, a lagging replica could otherwise store old
+    rows under the new version.
+    """
+
+    def __init__(self, model, timeout=60 * 60) -> None:
+        self.model = model
+        self.timeout = timeout
+        self.fields = [field.attname for field in model._meta.concrete_fields]
+        self.pk_index = self.fields.index(model._meta.pk.attname)
+        self.prefix = f"reference:{model._meta.label_lower}"
+        self.local = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.shared_hits = self.misses = 0
+
+    def version(self) -> str:
+        return cache.get_or_set(
+            f"{self.prefix}:version", lambda: uuid.uuid4().hex, self.timeout
+        )
+
+    def invalidate(self) -> None:
+        cache.set(f"{self.prefix}:version", uuid.uuid4().hex, self.timeout)
+        with self.lock:
+            self.local.clear()
+
+    def get_many(self, ids) -> dict:
+        """Fresh instances of the ``ids`` that exist, by primary key."""
+        ids = set(ids) - {None}
+        if not ids:
+            return {}
+        version = self.version()
+
+        rows = {}
+        with self.lock:
+            for pk in ids:
+                values = self.local.get((version, pk))
+                if values is not None:
+                    self.local.move_to_end((version, pk))
+                    rows[pk] = values
+            self.hits += len(rows)
+
+        missing = ids - set(rows)
+        if missing:
+            keys = {f"{self.prefix}:{version}:{pk}": pk for pk in missing}
+            found = {
+                keys[key]: values
+                for key, values in cache.get_many(keys).items()
+            }
+            unknown = missing - set(found)
+            with self.lock:
+                self.shared_hits += len(found)
+                self.misses += len(unknown)
+
+            if unknown:
+                loaded = {
+                    values[self.pk_index]: values
+                    for values in self.model._base_manager.db_manager(
+                        DEFAULT_DB_ALIAS
+                    )
+                    .filter(pk__in=unknown)
+                    .values_list(*self.fields)
+                }
+                cache.set_many(
+                    {
+                        f"{self.prefix}:{version}:{pk}": values
+                        for pk, values in loaded.items()
+                    },
+                    self.timeout,
+                )
+                found.update(loaded)
+            self.store(version, found)
+            rows.update(found)
+
+        return {
+            pk: self.model.from_db(DEFAULT_DB_ALIAS, self.fields, values)
+            for pk, values in rows.items()
+        }
+
+    def store(self, version, rows) -> None:
+        with self.lock:
+            for pk, values in rows.items():
+                self.local[(version, pk)] = values
+                self.local.move_to_end((version, pk))
+            while len(self.local) > settings.REFERENCE_CACHE_SIZE:
+                self.local.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "size": len(self.local),
+        }
+
+
+train_types = ReferenceCache(TrainType)
+trains = ReferenceCache(Train)
+stations = ReferenceCache(Station)
+routes = ReferenceCache(Route)
+
+
+def attach(instances, field, reference) -> list:
+    """Set the ``field`` foreign key of ``instances`` from ``reference``.
+
+    Instances that loaded it already, e.g. through ``select_related``, are
+    left alone. Returns the related objects of all ``instances``.
+    """
+    related = []
+    pending = []
+    for instance in instances:
+        if instance._meta.get_field(field).is_cached(instance):
+            related.append(getattr(instance, field))
+        else:
+            pending.append(instance)
+
+    if pending:
+        attname = pending[0]._meta.get_field(field).attname
+        found = reference.get_many(
+            getattr(instance, attname) for instance in pending
+        )
+        for instance in pending:
+            value = found.get(getattr(instance, attname))
+            if value is not None:
+                setattr(instance, field, value)
+                related.append(value)
+    return related
+
+
+def attach_trip_references(trips) -> None:
+    attach(trips, "route", routes)
+    attach(attach(trips, "train", trains), "train_type", train_types)
+
+
+def attach_route_references(route_list) -> None:
+    attach(route_list, "source", stations)
+    attach(route_list, "destination", stations)
+
+
+def reference_stats() -> dict:
+    return {
+        reference.model._meta.model_name: reference.stats()
+        for reference in (train_types, trains, stations, routes)
+    }
@@ -0,0 +1,116 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+PIN_COOKIE = "primary_pin"
+
+read_from_replica = ContextVar("read_from_replica", default=False)
+
+
+class ReplicaRouter:
+    """Send reads of replica-enabled requests to ``REPLICA_DATABASES``.
+
+    Everything else, writes included, stays on ``default``. A request only
+    reads from a replica while ``read_from_replica`` is set, which
+    ``ReplicaReadMixin`` does for safe requests of clients that did not
+    write recently.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        if settings.REPLICA_DATABASES and read_from_replica.get():
+            return random.choice(settings.REPLICA_DATABASES)
+        return None
+
+    def db_for_write(self, model, **hints) -> str:
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, **hints) -> bool:
+        return db not in settings.REPLICA_DATABASES
+
+
+def pin_key(user_id) -> str:
+    return f"primary-pin:{user_id}"
+
+
+def get_token_user_id(request) -> int | None:
+    """User id of a valid bearer token, read without loading the user, so
+    the trip and route lists, which do not authenticate, still find the
+    pin of token clients."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except AuthenticationFailed:
+        return None
+    return token.get(api_settings.USER_ID_CLAIM)
+
+
+def is_pinned(request) -> bool:
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, "user", None)
+    if user and user.is_authenticated:
+        user_id = user.id
+    else:
+        user_id = get_token_user_id(request)
+    return bool(user_id and cache.get(pin_key(user_id)))
+
+
+def pin_primary(request, response) -> None:
+    """Keep the client on the primary for ``REPLICA_PIN_SECONDS``.
+
+    The cookie covers anonymous endpoints like the trip list, the cache
+    entry covers token clients that do not keep cookies.
+    """
+    if not settings.REPLICA_DATABASES:
+        return
+    response.set_cookie(
+        PIN_COOKIE,
+        "1",
+        max_age=settings.REPLICA_PIN_SECONDS,
+        httponly=True,
+        samesite="Lax",
+    )
+    user = getattr(request, "user", None)
+    if user and user.is_authenticated:
+        cache.set(pin_key(user.id), True, settings.REPLICA_PIN_SECONDS)
+
+
+class ReplicaReadMixin:
+    """Serve safe requests of the view from a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        token = read_from_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            read_from_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs) -> None:
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_pinned(request):
+            read_from_replica.set(True)
+
+
+class PrimaryPinMixin:
+    """Pin the client to the primary after a successful write."""
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_primary(request, response)
+        return response
@@ -0,0 +1,88 @@
+import heapq
+import itertools
+from operator import itemgetter
+
+from train.models import Trip
+
+
+def overlapping_pairs(intervals):
+    """Key pairs of overlapping ``(departure, arrival, key)`` intervals.
+
+    A single sweep in departure order, a heap keyed by arrival holds the
+    intervals still running. Back-to-back trips do not overlap.
+    """
+    running = []
+    sequence = itertools.count()
+    for departure, arrival, key in sorted(intervals, key=itemgetter(0, 1)):
+        while running and running[0][0] <= departure:
+            heapq.heappop(running)
+        for _, _, other in running:
+            yield other, key
+        heapq.heappush(running, (arrival, next(sequence), key))
+
+
+def find_conflicts(candidates, exclude=()) -> dict:
+    """Overlaps of new trips with saved trips and with each other.
+
+    ``candidates`` are ``(key, train id, departure, arrival)`` tuples. Saved
+    trips of the same trains are read with one range query on the
+    ``(train, departure_time, arrival_time)`` index. Returns
+    ``{key: {"trips": [trip ids], "candidates": [keys]}}`` for conflicting
+    candidates only.
+    """
+    if not candidates:
+        return {}
+
+    intervals = {}
+    for key, train_id, departure, arrival in candidates:
+        intervals.setdefault(train_id, []).append(
+            (departure, arrival, (True, key))
+        )
+
+    saved = (
+        Trip.objects.filter(
+            train_id__in=intervals,
+            departure_time__lt=max(candidate[3] for candidate in candidates),
+            arrival_time__gt=min(candidate[2] for candidate in candidates),
+        )
+        .exclude(pk__in=exclude)
+        .values_list("id", "train_id", "departure_time", "arrival_time")
+    )
+    for trip_id, train_id, departure, arrival in saved:
+        intervals[train_id].append((departure, arrival, (False, trip_id)))
+
+    conflicts = {}
+
+    def add(candidate, other) -> None:
+        found = conflicts.setdefault(
+            candidate, {"trips": [], "candidates": []}
+        )
+        found["candidates" if other[0] else "trips"].append(other[1])
+
+    for train_intervals in intervals.values():
+        for first, second in overlapping_pairs(train_intervals):
+            if first[0]:
+                add(first[1], second)
+            if second[0]:
+                add(second[1], first)
+    return conflicts
+
+
+def schedule_conflicts():
+    """``(train id, trip id, trip id)`` of every overlapping saved pair.
+
+    Trips are streamed in ``(train, departure_time)`` order, so each train
+    is swept once and only its own trips are held in memory.
+    """
+    trips = (
+        Trip.objects.order_by("train_id", "departure_time")
+        .values_list("train_id", "id", "departure_time", "arrival_time")
+        .iterator(chunk_size=2000)
+    )
+    for train_id, rows in itertools.groupby(trips, key=itemgetter(0)):
+        intervals = [
+            (departure, arrival, trip_id)
+            for _, trip_id, departure, arrival in rows
+        ]
+        for first, second in overlapping_pairs(intervals):
+            yield train_id, first, second
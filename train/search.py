@@ -0,0 +1,160 @@
+import bisect
+import unicodedata
+from threading import RLock
+
+from train.catalog import get_catalog_state, STATIONS
+from train.models import Station
+
+
+def normalize(value) -> str:
+    """Casefold, strip accents and collapse whitespace."""
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(char for char in value if not unicodedata.combining(char))
+    return " ".join(value.casefold().split())
+
+
+def trigrams(value) -> set[str]:
+    return {value[i:i + 3] for i in range(len(value) - 2)}
+
+
+class StationNameIndex:
+    """Per-process prefix and trigram index of normalized station names.
+
+    Every word of a name is a prefix entry in a sorted list, so both
+    ``"kyi"`` and ``"pas"`` find "Kyiv Pasazhyrskyi" with a binary search.
+    Substring lookups intersect trigram postings and verify the survivors.
+    The index is loaded lazily and reloaded when the stations catalog
+    version, which a station write in any worker replaces, has changed.
+    """
+
+    def __init__(self) -> None:
+        self.lock = RLock()
+        self.version = None
+        self.names = {}
+        self.prefixes = []
+        self.postings = {}
+
+    def ensure_loaded(self) -> None:
+        # Read before the rows, a write during the load changes the
+        # version again and the next lookup reloads.
+        version, _ = get_catalog_state(STATIONS)
+        if version == self.version:
+            return
+        with self.lock:
+            if version == self.version:
+                return
+            loaded = StationNameIndex()
+            for station_id, name in Station.objects.values_list("id", "name"):
+                loaded.add(station_id, name)
+            self.names = loaded.names
+            self.prefixes = loaded.prefixes
+            self.postings = loaded.postings
+            self.version = version
+
+    @staticmethod
+    def word_starts(normalized) -> list[str]:
+        return [
+            normalized[i:]
+            for i, char in enumerate(normalized)
+            if char.isalnum() and (i == 0 or not normalized[i - 1].isalnum())
+        ]
+
+    def add(self, station_id, name) -> None:
+        with self.lock:
+            self.remove(station_id)
+            normalized = normalize(name)
+            self.names[station_id] = (name, normalized)
+            for key in self.word_starts(normalized):
+                bisect.insort(self.prefixes, (key, station_id))
+            for trigram in trigrams(normalized):
+                self.postings.setdefault(trigram, set()).add(station_id)
+
+    def remove(self, station_id) -> None:
+        with self.lock:
+            entry = self.names.pop(station_id, None)
+            if entry is None:
+                return
+            normalized = entry[1]
+            for key in self.word_starts(normalized):
+                index = bisect.bisect_left(self.prefixes, (key, station_id))
+                if self.prefixes[index:index + 1] == [(key, station_id)]:
+                    del self.prefixes[index]
+            for trigram in trigrams(normalized):
+                postings = self.postings.get(trigram)
+                if postings is not None:
+                    postings.discard(station_id)
+                    if not postings:
+                        del self.postings[trigram]
+
+    def prefix(self, query, limit=None) -> list[int]:
+        """Ids of stations with a word starting with ``query``."""
+        self.ensure_loaded()
+        return self.match_prefix(query, limit)
+
+    def substring(self, query) -> list[int]:
+        """Ids of stations whose normalized name contains ``query``."""
+        self.ensure_loaded()
+        return self.match_substring(query)
+
+    def match_prefix(self, query, limit=None) -> list[int]:
+        query = normalize(query)
+        if not query:
+            return []
+
+        found = {}
+        with self.lock:
+            index = bisect.bisect_left(self.prefixes, (query,))
+            while index < len(self.prefixes):
+                key, station_id = self.prefixes[index]
+                if not key.startswith(query):
+                    break
+                found[station_id] = None
+                if limit and len(found) >= limit:
+                    break
+                index += 1
+        return list(found)
+
+    def match_substring(self, query) -> list[int]:
+        query = normalize(query)
+        if not query:
+            return []
+
+        with self.lock:
+            query_trigrams = trigrams(query)
+            if not query_trigrams:
+                candidates = self.names.keys()
+            else:
+                candidates = set.intersection(
+                    *(
+                        self.postings.get(trigram, set())
+                        for trigram in query_trigrams
+                    )
+                )
+            return [
+                station_id
+                for station_id in candidates
+                if query in self.names[station_id][1]
+            ]
+
+    def autocomplete(self, query, limit=10) -> list[dict]:
+        """Prefix matches first, then other substring matches, by name."""
+        self.ensure_loaded()
+        # Both lookups and the names come from one version of the index.
+        with self.lock:
+            station_ids = self.match_prefix(query, limit=limit)
+            if len(station_ids) < limit and len(normalize(query)) >= 3:
+                station_ids += sorted(
+                    (
+                        station_id
+                        for station_id in self.match_substring(query)
+                        if station_id not in station_ids
+                    ),
+                    key=lambda station_id: self.names[station_id][1],
+                )[:limit - len(station_ids)]
+            return [
+                {"id": station_id, "name": self.names[station_id][0]}
+                for station_id in station_ids
+            ]
+
+
+station_index = StationNameIndex()
@@ -0,0 +1,67 @@
+from typing import Iterable
+
+
+class SeatMap:
+    """Bitset of taken seats, bit ``n - 1`` stands for seat ``n``."""
+
+    def __init__(self, data: bytes = b"", size: int = 0) -> None:
+        self.bits = int.from_bytes(bytes(data or b""), "little")
+        self.size = size
+
+    def __contains__(self, seat: int) -> bool:
+        return seat >= 1 and bool(self.bits >> (seat - 1) & 1)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def occupy(self, seats: Iterable[int]) -> None:
+        for seat in seats:
+            self.bits |= 1 << (seat - 1)
+
+    def release(self, seats: Iterable[int]) -> None:
+        for seat in seats:
+            self.bits &= ~(1 << (seat - 1))
+
+    def seats(self) -> list[int]:
+        taken = []
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            taken.append(lowest.bit_length())
+            bits ^= lowest
+        return taken
+
+    def free_seats(self, count: int, together: bool = False) -> list[int]:
+        """Lowest ``count`` free seats, or the first ``count`` adjacent
+        ones when ``together``. Empty if they do not fit."""
+        if count < 1:
+            return []
+        free = ~self.bits & ((1 << self.size) - 1)
+
+        if together:
+            # Bit n of ``runs`` is set when seats n + 1 .. n + length are
+            # all free, the run length doubles on every step.
+            runs, length = free, 1
+            while length * 2 <= count:
+                runs &= runs >> length
+                length *= 2
+            if length < count:
+                runs &= runs >> (count - length)
+            if not runs:
+                return []
+            start = (runs & -runs).bit_length()
+            return list(range(start, start + count))
+
+        seats = []
+        while free and len(seats) < count:
+            lowest = free & -free
+            seats.append(lowest.bit_length())
+            free ^= lowest
+        return seats if len(seats) == count else []
+
+    def free_count(self) -> int:
+        return max(self.size - len(self), 0)
+
+    def to_bytes(self) -> bytes:
+        length = max((self.size + 7) // 8, (self.bits.bit_length() + 7) // 8)
+        return self.bits.to_bytes(length, "little")
@@ -1,7 +1,16 @@
+from datetime import timedelta
+
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError, ErrorDetail
+from rest_framework.settings import api_settings
 
-from django.db import transaction
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction, IntegrityError
+from django.db.models import Min
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema_field
 
 from train.models import (
     TrainType,
@@ -11,8 +20,37 @@ from train.models import (
     Crew,
     Order,
     Trip,
-    Ticket
+    Ticket,
+    SeatHold,
 )
+from train.images import variants_ready
+from train.references import attach_route_references, attach_trip_references
+from train.schedule import find_conflicts
+
+
+class ReferenceListSerializer(serializers.ListSerializer):
+    """Attach the references of a whole page before serializing it."""
+
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, "all") else data)
+        self.child.attach_references(items)
+        return super().to_representation(items)
+
+
+class ReferenceSerializerMixin:
+    """Read foreign keys from ``train.references`` instead of JOINs.
+
+    ``attach_references`` runs once per page through
+    ``ReferenceListSerializer`` and once per instance otherwise, objects
+    that have their references already are skipped.
+    """
+
+    def attach_references(self, instances) -> None:
+        """Fill the foreign keys the serializer reads, none by default."""
+
+    def to_representation(self, instance):
+        self.attach_references([instance])
+        return super().to_representation(instance)
 
 
 class TrainTypeSerializer(serializers.ModelSerializer):
@@ -22,9 +60,39 @@ class TrainTypeSerializer(serializers.ModelSerializer):
 
 
 class StationSerializer(serializers.ModelSerializer):
+    images = serializers.SerializerMethodField()
+
     class Meta:
         model = Station
-        fields = ("id", "name", "latitude", "longitude", "image")
+        fields = ("id", "name", "latitude", "longitude", "image", "images")
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_images(self, station) -> dict:
+        """Thumbnail URLs by size and format, empty until generated."""
+        if not variants_ready(station):
+            return {}
+        request = self.context.get("request")
+
+        def url(path) -> str:
+            url = default_storage.url(path)
+            return request.build_absolute_uri(url) if request else url
+
+        return {
+            size: {output: url(path) for output, path in outputs.items()}
+            for size, outputs in station.image_variants["sizes"].items()
+        }
+
+
+class StationNearbySerializer(StationSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(StationSerializer.Meta):
+        fields = StationSerializer.Meta.fields + ("distance",)
+
+
+class StationAutocompleteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
 
 
 class RouteSerializer(serializers.ModelSerializer):
@@ -33,7 +101,7 @@ class RouteSerializer(serializers.ModelSerializer):
         fields = ("id", "name", "source", "destination", "distance")
 
 
-class RouteListSerializer(RouteSerializer):
+class RouteListSerializer(ReferenceSerializerMixin, RouteSerializer):
     source = serializers.SlugRelatedField(
         many=False,
         read_only=True,
@@ -44,7 +112,24 @@ class RouteListSerializer(RouteSerializer):
     )
 
     class Meta(RouteSerializer.Meta):
-        pass
+        list_serializer_class = ReferenceListSerializer
+
+    def attach_references(self, instances) -> None:
+        attach_route_references(instances)
+
+
+class JourneyRouteSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    distance = serializers.IntegerField()
+
+
+class JourneySerializer(serializers.Serializer):
+    distance = serializers.IntegerField()
+    transfers = serializers.IntegerField()
+    routes = JourneyRouteSerializer(many=True)
 
 
 class TrainSerializer(serializers.ModelSerializer):
@@ -65,10 +150,33 @@ class TripSerializer(serializers.ModelSerializer):
             arrival=attrs["arrival_time"],
             error_to_raise=ValidationError,
         )
+
+        conflicts = find_conflicts(
+            [
+                (
+                    None,
+                    attrs["train"].id,
+                    attrs["departure_time"],
+                    attrs["arrival_time"],
+                )
+            ],
+            exclude=[self.instance.pk] if self.instance else (),
+        )
+        if conflicts:
+            trips = sorted(conflicts[None]["trips"])
+            raise ValidationError(
+                {"train": [f"The train runs trips {trips} at this time."]}
+            )
         return data
 
 
-class TripListSerializer(TripSerializer):
+class ScheduleConflictSerializer(serializers.Serializer):
+    train = serializers.IntegerField()
+    trip = serializers.IntegerField()
+    conflicting_trip = serializers.IntegerField()
+
+
+class TripListSerializer(ReferenceSerializerMixin, TripSerializer):
     train_type = serializers.CharField(
         source="train.train_type",
         read_only=True
@@ -85,12 +193,19 @@ class TripListSerializer(TripSerializer):
             "train_type",
             "available_seats",
         )
+        list_serializer_class = ReferenceListSerializer
+
+    def attach_references(self, instances) -> None:
+        attach_trip_references(instances)
 
 
 class TripRetrieveSerializer(TripListSerializer):
     train = TrainSerializer(many=False, read_only=True)
-    taken_seats = serializers.SlugRelatedField(
-        source="tickets", many=True, read_only=True, slug_field="seat"
+    taken_seats = serializers.ListField(
+        source="seats_taken", child=serializers.IntegerField(), read_only=True
+    )
+    held_seats = serializers.ListField(
+        source="seats_held", child=serializers.IntegerField(), read_only=True
     )
 
     class Meta(TripListSerializer.Meta):
@@ -101,6 +216,7 @@ class TripRetrieveSerializer(TripListSerializer):
             "arrival_time",
             "train",
             "taken_seats",
+            "held_seats",
             "available_seats",
         )
 
@@ -128,18 +244,116 @@ class TrainListSerializer(TrainSerializer):
 
 
 class TrainRetrieveSerializer(TrainSerializer):
-    trips = serializers.SerializerMethodField()
+    trip_count = serializers.IntegerField(read_only=True)
+    first_departure = serializers.DateTimeField(read_only=True)
+    last_departure = serializers.DateTimeField(read_only=True)
 
     class Meta(TrainSerializer.Meta):
-        fields = TrainSerializer.Meta.fields + ("trips",)
+        fields = TrainSerializer.Meta.fields + (
+            "trip_count",
+            "first_departure",
+            "last_departure",
+        )
+
 
-    @staticmethod
-    def get_trips(instance) -> list:
-        trips_queryset = instance.trips.all()
-        return [trip.route.name for trip in trips_queryset]
+class TrainTimetableSerializer(TripListSerializer):
+    class Meta(TripListSerializer.Meta):
+        fields = (
+            "id",
+            "route_name",
+            "departure_time",
+            "arrival_time",
+            "available_seats",
+        )
+
+
+class TripPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.preloaded = {}
+
+    def preload(self, pks) -> None:
+        self.preloaded = self.get_queryset().in_bulk(
+            {
+                pk for pk in pks
+                if isinstance(pk, int) and not isinstance(pk, bool)
+            }
+        )
+
+    def to_internal_value(self, data) -> Trip:
+        if (
+            isinstance(data, int)
+            and not isinstance(data, bool)
+            and data in self.preloaded
+        ):
+            return self.preloaded[data]
+        return super().to_internal_value(data)
+
+
+class BulkTicketSerializer(serializers.ListSerializer):
+    unique_message = "The fields trip, seat must make a unique set."
+    held_message = "The seat is held by another user."
+    not_held_message = "Hold the seat before ordering it."
+
+    def get_holders(self, tickets_data) -> dict:
+        """``(trip id, seat)`` to user id of the active holds on
+        requested seats."""
+        if not tickets_data:
+            return {}
+        holds = SeatHold.objects.active().filter(
+            trip_id__in={ticket["trip"].id for ticket in tickets_data},
+            seat__in={ticket["seat"] for ticket in tickets_data},
+        )
+        return {
+            (trip_id, seat): user_id
+            for trip_id, seat, user_id in holds.values_list(
+                "trip_id", "seat", "user_id"
+            )
+        }
+
+    def get_hold_error(self, holders, trip, seat) -> str | None:
+        request = self.context.get("request")
+        user_id = getattr(getattr(request, "user", None), "id", None)
+        holder = holders.get((trip.id, seat))
+        if holder is not None and holder != user_id:
+            return self.held_message
+        if holder is None and settings.SEAT_HOLD_REQUIRED:
+            return self.not_held_message
+        return None
+
+    def to_internal_value(self, data) -> list:
+        if isinstance(data, list):
+            self.child.fields["trip"].preload(
+                item.get("trip") for item in data if isinstance(item, dict)
+            )
+
+        tickets_data = super().to_internal_value(data)
+
+        errors = []
+        requested = set()
+        holders = self.get_holders(tickets_data)
+        for ticket_data in tickets_data:
+            trip, seat = ticket_data["trip"], ticket_data["seat"]
+            if seat in trip.occupancy or (trip.id, seat) in requested:
+                error = ErrorDetail(self.unique_message, code="unique")
+            elif message := self.get_hold_error(holders, trip, seat):
+                error = ErrorDetail(message, code="held")
+            else:
+                error = None
+            errors.append(
+                {api_settings.NON_FIELD_ERRORS_KEY: [error]} if error else {}
+            )
+            requested.add((trip.id, seat))
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return tickets_data
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    trip = TripPrimaryKeyField(queryset=Trip.objects.select_related("train"))
+
     def validate(self, attrs) -> None:
         data = super(TicketSerializer, self).validate(attrs)
         Ticket.validate_ticket(
@@ -153,6 +367,8 @@ class TicketSerializer(serializers.ModelSerializer):
     class Meta:
         model = Ticket
         fields = ("luggage_weight", "seat", "trip")
+        list_serializer_class = BulkTicketSerializer
+        validators = []
 
 
 class TicketListSerializer(TicketSerializer):
@@ -171,11 +387,250 @@ class OrderSerializer(serializers.ModelSerializer):
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
 
+            seats_by_trip = {}
             for ticket_data in tickets_data:
-                Ticket.objects.create(order=order, **ticket_data)
+                seats_by_trip.setdefault(ticket_data["trip"].id, []).append(
+                    ticket_data["seat"]
+                )
+            # The seats may have been held by someone else since validation.
+            for trip_id, seats in seats_by_trip.items():
+                if (
+                    SeatHold.objects.active()
+                    .filter(trip_id=trip_id, seat__in=seats)
+                    .exclude(user=order.user)
+                    .exists()
+                ):
+                    raise ValidationError(
+                        {"tickets": [BulkTicketSerializer.held_message]}
+                    )
+
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        Ticket(order=order, **ticket_data)
+                        for ticket_data in tickets_data
+                    )
+            except IntegrityError:
+                raise ValidationError(
+                    {"tickets": [BulkTicketSerializer.unique_message]}
+                )
+
+            for trip_id, seats in seats_by_trip.items():
+                Trip.update_occupancy(trip_id, occupied=seats)
+                SeatHold.objects.filter(
+                    trip_id=trip_id, seat__in=seats, user=order.user
+                ).delete()
 
             return order
 
 
-class OrderListSerializer(OrderSerializer):
+class OrderAllocateSerializer(serializers.Serializer):
+    trip = serializers.PrimaryKeyRelatedField(
+        queryset=Trip.objects.select_related("train")
+    )
+    passengers = serializers.IntegerField(min_value=1)
+    together = serializers.BooleanField(default=False)
+    luggage_weight = serializers.IntegerField(min_value=0, default=0)
+    order = serializers.IntegerField(read_only=True)
+    seats = serializers.ListField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    def validate(self, attrs) -> dict:
+        train = attrs["trip"].train
+        if attrs["passengers"] > train.seats_num:
+            raise ValidationError(
+                {"passengers": [f"The train has {train.seats_num} seats."]}
+            )
+        if attrs["luggage_weight"] > train.luggage_space:
+            raise ValidationError(
+                {
+                    "luggage_weight": [
+                        "Maximum luggage weight per ticket is "
+                        f"{train.luggage_space}"
+                    ]
+                }
+            )
+        return attrs
+
+    def create(self, validated_data) -> dict:
+        """Pick free seats and book them in one transaction.
+
+        The trip row stays locked from reading its seat map until
+        ``Trip.update_occupancy`` writes it back, seats held by other users
+        are skipped.
+        """
+        user = validated_data["user"]
+        passengers = validated_data["passengers"]
+
+        with transaction.atomic():
+            trip = (
+                Trip.objects.select_for_update(of=("self",))
+                .select_related("train")
+                .get(pk=validated_data["trip"].pk)
+            )
+            blocked = trip.occupancy
+            blocked.occupy(
+                SeatHold.objects.active()
+                .filter(trip=trip)
+                .exclude(user=user)
+                .values_list("seat", flat=True)
+            )
+            seats = blocked.free_seats(
+                passengers, together=validated_data["together"]
+            )
+            if not seats:
+                message = (
+                    f"No {passengers} adjacent free seats on this trip."
+                    if validated_data["together"]
+                    else f"Only {blocked.free_count()} seats are free."
+                )
+                raise ValidationError({"passengers": [message]})
+
+            order = Order.objects.create(user=user)
+            try:
+                with transaction.atomic():
+                    Ticket.objects.bulk_create(
+                        Ticket(
+                            order=order,
+                            trip=trip,
+                            seat=seat,
+                            luggage_weight=validated_data["luggage_weight"],
+                        )
+                        for seat in seats
+                    )
+            except IntegrityError:
+                raise ValidationError(
+                    {"passengers": [BulkTicketSerializer.unique_message]}
+                )
+
+            Trip.update_occupancy(trip.pk, occupied=seats)
+            SeatHold.objects.filter(
+                trip=trip, seat__in=seats, user=user
+            ).delete()
+
+        return {**validated_data, "order": order.id, "seats": seats}
+
+
+class OrderListSerializer(ReferenceSerializerMixin, OrderSerializer):
     tickets = TicketListSerializer(many=True, read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        list_serializer_class = ReferenceListSerializer
+
+    def attach_references(self, instances) -> None:
+        attach_trip_references(
+            [
+                ticket.trip
+                for order in instances
+                for ticket in order.tickets.all()
+            ]
+        )
+
+
+class SeatHoldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SeatHold
+        fields = ("id", "trip", "seat", "expires_at")
+        read_only_fields = fields
+
+
+class SeatHoldCreateSerializer(serializers.Serializer):
+    trip = serializers.PrimaryKeyRelatedField(
+        queryset=Trip.objects.select_related("train")
+    )
+    seats = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
+    expires_at = serializers.DateTimeField(read_only=True)
+
+    def validate(self, attrs) -> dict:
+        trip, seats = attrs["trip"], attrs["seats"]
+        seats_num = trip.train.seats_num
+        if trip.departure_time <= timezone.now():
+            raise ValidationError({"trip": ["The trip has already departed."]})
+        if len(set(seats)) != len(seats):
+            raise ValidationError({"seats": ["Seats must be unique."]})
+        if not all(1 <= seat <= seats_num for seat in seats):
+            raise ValidationError(
+                {"seats": [f"Seat number must be in range [1, {seats_num}]"]}
+            )
+
+        occupancy = trip.occupancy
+        sold = [seat for seat in seats if seat in occupancy]
+        if sold:
+            raise ValidationError(
+                {"seats": [f"Seats {sold} are already sold."]}
+            )
+        return attrs
+
+    def create(self, validated_data) -> dict:
+        """Hold free seats and extend holds the user already has.
+
+        Expired holds on the requested seats are dropped first, so the
+        unique ``(trip, seat)`` constraint only rejects live holds of
+        other users. Holds that would outlive ``SEAT_HOLD_MAX_LIFETIME``
+        are not extended, one user holds at most ``SEAT_HOLD_MAX_SEATS``
+        seats of a trip.
+        """
+        trip, seats = validated_data["trip"], validated_data["seats"]
+        user = validated_data["user"]
+        expires_at = SeatHold.get_expiry()
+
+        with transaction.atomic():
+            holds = SeatHold.objects.filter(trip=trip, seat__in=seats)
+            holds.expired().delete()
+            holders = dict(holds.values_list("seat", "user_id"))
+
+            taken = sorted(
+                seat for seat, holder in holders.items() if holder != user.id
+            )
+            if taken:
+                raise ValidationError(
+                    {"seats": [f"Seats {taken} are held by another user."]}
+                )
+
+            held = (
+                SeatHold.objects.active()
+                .filter(trip=trip, user=user)
+                .exclude(seat__in=seats)
+                .count()
+            )
+            if held + len(seats) > settings.SEAT_HOLD_MAX_SEATS:
+                raise ValidationError(
+                    {
+                        "seats": [
+                            "You can hold up to "
+                            f"{settings.SEAT_HOLD_MAX_SEATS} seats of a "
+                            f"trip, {held} are held already."
+                        ]
+                    }
+                )
+
+            holds.filter(
+                user=user,
+                created_at__gte=expires_at
+                - timedelta(seconds=settings.SEAT_HOLD_MAX_LIFETIME),
+            ).update(expires_at=expires_at)
+            try:
+                with transaction.atomic():
+                    SeatHold.objects.bulk_create(
+                        SeatHold(
+                            trip=trip,
+                            seat=seat,
+                            user=user,
+                            expires_at=expires_at,
+                        )
+                        for seat in seats
+                        if seat not in holders
+                    )
+            except IntegrityError:
+                raise ValidationError(
+                    {"seats": ["Seats were just held by another user."]}
+                )
+            # Earlier than requested when a hold reached its lifetime.
+            expires_at = holds.aggregate(expires_at=Min("expires_at"))[
+                "expires_at"
+            ]
+
+        return {"trip": trip, "seats": seats, "expires_at": expires_at}
@@ -0,0 +1,101 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from train.catalog import touch_catalog, STATIONS, ROUTES
+from train.images import schedule_variants, variants_ready
+from train.jobs import enqueue
+from train.models import (
+    TrainType,
+    Train,
+    Station,
+    Route,
+    Trip,
+    Ticket,
+    Order,
+)
+from train.references import train_types, trains, stations, routes
+from train.tasks import send_order_confirmation
+
+
+@receiver(post_save, sender=Ticket)
+def occupy_ticket_seat(sender, instance, **kwargs) -> None:
+    previous = getattr(instance, "loaded_seat", None)
+    current = (instance.trip_id, instance.seat)
+    if previous == current:
+        return
+
+    if previous:
+        Trip.update_occupancy(previous[0], released=[previous[1]])
+    Trip.update_occupancy(instance.trip_id, occupied=[instance.seat])
+    instance.loaded_seat = current
+
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_seat(sender, instance, **kwargs) -> None:
+    trip_id, seat = getattr(
+        instance, "loaded_seat", (instance.trip_id, instance.seat)
+    )
+    Trip.update_occupancy(trip_id, released=[seat])
+
+
+@receiver(post_save, sender=Train)
+def update_trip_available_seats(sender, instance, created, **kwargs) -> None:
+    if not created:
+        Trip.objects.filter(train=instance).update(
+            available_seats=Greatest(instance.seats_num - F("sold_seats"), 0)
+        )
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def invalidate_station_catalogs(sender, **kwargs) -> None:
+    transaction.on_commit(partial(touch_catalog, STATIONS, ROUTES))
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_route_catalog(sender, **kwargs) -> None:
+    transaction.on_commit(partial(touch_catalog, ROUTES))
+
+
+@receiver(post_save, sender=Station)
+def generate_station_images(sender, instance, **kwargs) -> None:
+    if instance.image and not variants_ready(instance):
+        transaction.on_commit(
+            partial(schedule_variants, instance.id, instance.image.name)
+        )
+
+
+@receiver(post_save, sender=TrainType)
+@receiver(post_delete, sender=TrainType)
+def invalidate_train_type_references(sender, **kwargs) -> None:
+    transaction.on_commit(train_types.invalidate)
+
+
+@receiver(post_save, sender=Train)
+@receiver(post_delete, sender=Train)
+def invalidate_train_references(sender, **kwargs) -> None:
+    transaction.on_commit(trains.invalidate)
+
+
+@receiver(post_save, sender=Station)
+@receiver(post_delete, sender=Station)
+def invalidate_station_references(sender, **kwargs) -> None:
+    transaction.on_commit(stations.invalidate)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def invalidate_route_references(sender, **kwargs) -> None:
+    transaction.on_commit(routes.invalidate)
+
+
+@receiver(post_save, sender=Order)
+def confirm_order(sender, instance, created, **kwargs) -> None:
+    if created:
+        enqueue(send_order_confirmation, order_id=instance.id)
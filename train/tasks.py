@@ -0,0 +1,30 @@
+from django.core.mail import send_mail
+from django.utils import timezone
+
+from train.jobs import register
+from train.models import Order
+
+
+@register
+def send_order_confirmation(order_id) -> None:
+    order = (
+        Order.objects.select_related("user")
+        .prefetch_related("tickets__trip__route")
+        .filter(pk=order_id)
+        .first()
+    )
+    if order is None:
+        return
+
+    lines = [
+        f"{ticket.trip.route.name}, "
+        f"{timezone.localtime(ticket.trip.departure_time):%Y-%m-%d %H:%M}, "
+        f"seat {ticket.seat}"
+        for ticket in order.tickets.all()
+    ]
+    send_mail(
+        subject=f"Order #{order.id} is confirmed",
+        message="\n".join(["Your tickets:", *lines]),
+        from_email=None,
+        recipient_list=[order.user.email],
+    )
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from train.models import Order, SeatHold, Ticket, Trip
+from train.tests.test_seat_map import sample_trip
+from train.views import OrderViewSet
+
+ALLOCATE_URL = "/station/orders/allocate/"
+
+
+@mock.patch.object(OrderViewSet, "throttle_classes", ())
+class OrderAllocateTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.trip = sample_trip(seats_num=10)
+
+    def allocate(self, passengers, together=False):
+        return self.client.post(
+            ALLOCATE_URL,
+            {
+                "trip": self.trip.id,
+                "passengers": passengers,
+                "together": together,
+            },
+            format="json",
+        )
+
+    def sell(self, *seats) -> None:
+        order = Order.objects.create(user=self.other)
+        for seat in seats:
+            Ticket.objects.create(
+                order=order, trip=self.trip, seat=seat, luggage_weight=0
+            )
+
+    def test_lowest_free_seats(self) -> None:
+        self.sell(1, 3)
+
+        response = self.allocate(3)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["seats"], [2, 4, 5])
+        order = Order.objects.get(pk=response.data["order"])
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(
+            sorted(order.tickets.values_list("seat", flat=True)), [2, 4, 5]
+        )
+        trip = Trip.objects.get(pk=self.trip.pk)
+        self.assertEqual(trip.seats_taken, [1, 2, 3, 4, 5])
+        self.assertEqual(trip.sold_seats, 5)
+        self.assertEqual(trip.available_seats, 5)
+
+    def test_together(self) -> None:
+        self.sell(2, 5)
+
+        response = self.allocate(3, together=True)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["seats"], [6, 7, 8])
+
+    def test_no_adjacent_seats(self) -> None:
+        self.sell(3, 6, 9)
+
+        response = self.allocate(3, together=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["passengers"],
+            ["No 3 adjacent free seats on this trip."],
+        )
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 0)
+
+    def test_out_of_seats(self) -> None:
+        self.sell(*range(1, 9))
+
+        response = self.allocate(3)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["passengers"], ["Only 2 seats are free."]
+        )
+        self.assertEqual(self.allocate(2).data["seats"], [9, 10])
+        self.assertEqual(Trip.objects.get(pk=self.trip.pk).available_seats, 0)
+
+    def test_more_passengers_than_seats(self) -> None:
+        response = self.allocate(11)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["passengers"], ["The train has 10 seats."]
+        )
+
+    def test_seats_held_by_others_are_skipped(self) -> None:
+        expires_at = timezone.now() + timedelta(minutes=5)
+        SeatHold.objects.bulk_create(
+            [
+                SeatHold(
+                    trip=self.trip,
+                    seat=1,
+                    user=self.other,
+                    expires_at=expires_at,
+                ),
+                SeatHold(
+                    trip=self.trip,
+                    seat=2,
+                    user=self.user,
+                    expires_at=expires_at,
+                ),
+            ]
+        )
+
+        response = self.allocate(2)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["seats"], [2, 3])
+        self.assertEqual(
+            list(SeatHold.objects.values_list("user", flat=True)),
+            [self.other.id],
+        )
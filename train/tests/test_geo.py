@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from train.catalog import touch_catalog, STATIONS
+from train.geo import StationLocator
+from train.models import Station
+
+
+class StationLocatorTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.kyiv = Station.objects.create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        )
+        self.lviv = Station.objects.create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )
+        self.locator = StationLocator()
+
+    def nearby(self, radius_km=100) -> list[int]:
+        return [
+            station_id
+            for station_id, _ in self.locator.nearby(50.0, 30.0, radius_km, 10)
+        ]
+
+    def test_closest_first_within_radius(self) -> None:
+        bila_tserkva = Station.objects.create(
+            name="Bila Tserkva", latitude=49.8, longitude=30.11
+        )
+
+        self.assertEqual(self.nearby(), [bila_tserkva.id, self.kyiv.id])
+        self.assertEqual(self.nearby(radius_km=1), [])
+
+    def test_write_in_other_worker_reloads_locator(self) -> None:
+        self.assertEqual(self.nearby(), [self.kyiv.id])
+        # An update fires no signals here, like a write in another process
+        # that only replaced the shared catalog version.
+        Station.objects.filter(pk=self.lviv.pk).update(
+            latitude=50.1, longitude=30.1
+        )
+        self.assertEqual(self.nearby(), [self.kyiv.id])
+
+        touch_catalog(STATIONS)
+
+        self.assertEqual(self.nearby(), [self.lviv.id, self.kyiv.id])
+
+    def test_write_during_load_is_not_lost(self) -> None:
+        values_list = Station.objects.values_list
+
+        def load_racing_write(*fields):
+            rows = list(values_list(*fields))
+            Station.objects.filter(pk=self.lviv.pk).update(
+                latitude=50.1, longitude=30.1
+            )
+            touch_catalog(STATIONS)
+            return rows
+
+        with mock.patch.object(
+            Station.objects, "values_list", side_effect=load_racing_write
+        ):
+            self.assertEqual(self.nearby(), [self.kyiv.id])
+
+        self.assertEqual(self.nearby(), [self.lviv.id, self.kyiv.id])
+
+    def test_failed_load_is_retried(self) -> None:
+        with mock.patch.object(
+            Station.objects, "values_list", side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                self.nearby()
+
+        self.assertEqual(self.nearby(), [self.kyiv.id])
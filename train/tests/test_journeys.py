@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from train.catalog import touch_catalog, ROUTES
+from train.journeys import RouteGraph
+from train.models import Route, Station
+
+
+class RouteGraphTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.lviv, self.kyiv, self.odesa, self.vinnytsia = (
+            Station.objects.create(name=name, latitude=0, longitude=0)
+            for name in ("Lviv", "Kyiv", "Odesa", "Vinnytsia")
+        )
+        self.lviv_kyiv = self.route(self.lviv, self.kyiv, 540)
+        self.kyiv_odesa = self.route(self.kyiv, self.odesa, 475)
+        self.graph = RouteGraph()
+
+    @staticmethod
+    def route(source, destination, distance) -> Route:
+        return Route.objects.create(
+            name=f"{source.name} - {destination.name}",
+            source=source,
+            destination=destination,
+            distance=distance,
+        )
+
+    def test_find_station(self) -> None:
+        self.assertEqual(self.graph.find_station("lviv"), self.lviv.id)
+        self.assertEqual(
+            self.graph.find_station(str(self.odesa.id)), self.odesa.id
+        )
+        self.assertIsNone(self.graph.find_station("Kharkiv"))
+
+    def test_k_shortest_paths(self) -> None:
+        lviv_vinnytsia = self.route(self.lviv, self.vinnytsia, 300)
+        vinnytsia_odesa = self.route(self.vinnytsia, self.odesa, 400)
+        lviv_odesa = self.route(self.lviv, self.odesa, 2000)
+
+        self.assertEqual(
+            self.graph.k_shortest_paths(self.lviv.id, self.odesa.id, 5),
+            [
+                (700, [lviv_vinnytsia.id, vinnytsia_odesa.id]),
+                (1015, [self.lviv_kyiv.id, self.kyiv_odesa.id]),
+                (2000, [lviv_odesa.id]),
+            ],
+        )
+        self.assertEqual(
+            self.graph.k_shortest_paths(self.odesa.id, self.lviv.id, 5), []
+        )
+
+    def test_route_save_reloads_graph(self) -> None:
+        self.assertIsNone(
+            self.graph.shortest_path(self.lviv.id, self.vinnytsia.id)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            route = self.route(self.kyiv, self.vinnytsia, 270)
+
+        self.assertEqual(
+            self.graph.shortest_path(self.lviv.id, self.vinnytsia.id),
+            (810, [self.lviv_kyiv.id, route.id]),
+        )
+
+    def test_write_in_other_worker_reloads_graph(self) -> None:
+        self.assertEqual(
+            self.graph.shortest_path(self.lviv.id, self.odesa.id)[0], 1015
+        )
+        # An update fires no signals here, like a write in another process
+        # that only replaced the shared catalog version.
+        Route.objects.filter(pk=self.kyiv_odesa.pk).update(distance=400)
+
+        touch_catalog(ROUTES)
+
+        self.assertEqual(
+            self.graph.shortest_path(self.lviv.id, self.odesa.id)[0], 940
+        )
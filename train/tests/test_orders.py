@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from train.models import Order, Ticket, Trip
+from train.tests.test_seat_map import sample_trip
+from train.views import OrderViewSet
+
+ORDER_URL = reverse("train:order-list")
+UNIQUE_MESSAGE = "The fields trip, seat must make a unique set."
+
+
+@mock.patch.object(OrderViewSet, "throttle_classes", ())
+class OrderCreateTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.trip = sample_trip(seats_num=60)
+
+    def order(self, *tickets):
+        return self.client.post(
+            ORDER_URL,
+            {
+                "user": self.user.id,
+                "tickets": [
+                    {"trip": trip.id if trip else 999, "seat": seat,
+                     "luggage_weight": luggage}
+                    for trip, seat, luggage in tickets
+                ],
+            },
+            format="json",
+        )
+
+    def test_create_order(self) -> None:
+        response = self.order((self.trip, 1, 5), (self.trip, 7, 0))
+
+        self.assertEqual(response.status_code, 201)
+        order = Order.objects.get()
+        self.assertEqual(order.user, self.user)
+        self.assertEqual(
+            sorted(order.tickets.values_list("seat", flat=True)), [1, 7]
+        )
+        trip = Trip.objects.get(pk=self.trip.pk)
+        self.assertEqual(trip.seats_taken, [1, 7])
+        self.assertEqual(trip.available_seats, 58)
+
+    def test_queries_do_not_grow_with_tickets(self) -> None:
+        with CaptureQueriesContext(connection) as small:
+            self.order((self.trip, 1, 0), (self.trip, 2, 0))
+        with CaptureQueriesContext(connection) as large:
+            self.order(*((self.trip, seat, 0) for seat in range(10, 60)))
+
+        self.assertEqual(Ticket.objects.count(), 52)
+        self.assertEqual(
+            len(large.captured_queries), len(small.captured_queries)
+        )
+
+    def test_duplicate_seats_in_request(self) -> None:
+        response = self.order(
+            (self.trip, 3, 0), (self.trip, 4, 0), (self.trip, 3, 0)
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["tickets"],
+            [{}, {}, {"non_field_errors": [UNIQUE_MESSAGE]}],
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_sold_seat(self) -> None:
+        self.order((self.trip, 3, 0))
+
+        response = self.order((self.trip, 4, 0), (self.trip, 3, 0))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["tickets"],
+            [{}, {"non_field_errors": [UNIQUE_MESSAGE]}],
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_invalid_tickets_are_reported_by_position(self) -> None:
+        response = self.order(
+            (self.trip, 61, 0), (None, 5, 0), (self.trip, 6, 31)
+        )
+
+        self.assertEqual(response.status_code, 400)
+        seat_error, trip_error, luggage_error = response.data["tickets"]
+        self.assertEqual(
+            seat_error["non_field_errors"][0].code, "invalid"
+        )
+        self.assertIn("[1, 60", str(seat_error["non_field_errors"][0]))
+        self.assertEqual(trip_error["trip"][0].code, "does_not_exist")
+        self.assertIn("30", str(luggage_error["non_field_errors"][0]))
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_concurrent_booking_of_a_validated_seat(self) -> None:
+        self.order((self.trip, 5, 0))
+        # The seat map does not show the ticket yet, like a booking that
+        # committed after this request validated its seats.
+        Trip.objects.filter(pk=self.trip.pk).update(seat_map=b"")
+
+        response = self.order((self.trip, 8, 0), (self.trip, 5, 0))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"tickets": [UNIQUE_MESSAGE]})
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(Ticket.objects.filter(seat=8).exists())
@@ -0,0 +1,103 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from train.models import Route, Station, Train, TrainType, Trip
+from train.views import TripViewSet
+
+TRIP_URL = reverse("train:trip-list")
+
+
+@mock.patch.object(TripViewSet, "throttle_classes", ())
+class KeysetPaginationTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        train = Train.objects.create(
+            name="Intercity 1",
+            luggage_space=30,
+            seats_num=10,
+            train_type=TrainType.objects.create(name="Intercity"),
+        )
+        route = Route.objects.create(
+            name="Lviv - Kyiv",
+            source=Station.objects.create(
+                name="Lviv", latitude=49.84, longitude=24.03
+            ),
+            destination=Station.objects.create(
+                name="Kyiv", latitude=50.45, longitude=30.52
+            ),
+            distance=540,
+        )
+        start = timezone.now() + timedelta(days=1)
+        # Groups of trips leaving at the same time straddle page borders.
+        for index in range(25):
+            departure = start + timedelta(hours=index // 4)
+            Trip.objects.create(
+                route=route,
+                train=train,
+                departure_time=departure,
+                arrival_time=departure + timedelta(hours=6),
+            )
+        self.expected = list(
+            Trip.objects.order_by("departure_time", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def get_page(self, url, params=None) -> dict:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def ids(self, page) -> list[int]:
+        return [trip["id"] for trip in page["results"]]
+
+    def test_first_page(self) -> None:
+        page = self.get_page(TRIP_URL, {"pagination": "cursor"})
+
+        self.assertEqual(self.ids(page), self.expected[:10])
+        self.assertIsNotNone(page["next"])
+        self.assertIsNone(page["previous"])
+        self.assertNotIn("count", page)
+
+    def test_next_links_cover_ties_once(self) -> None:
+        pages = [self.get_page(TRIP_URL, {"pagination": "cursor"})]
+        while pages[-1]["next"]:
+            pages.append(self.get_page(pages[-1]["next"]))
+
+        self.assertEqual([len(page["results"]) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [trip_id for page in pages for trip_id in self.ids(page)],
+            self.expected,
+        )
+
+    def test_previous_link_returns_previous_page(self) -> None:
+        first = self.get_page(TRIP_URL, {"pagination": "cursor"})
+        second = self.get_page(first["next"])
+        last = self.get_page(second["next"])
+
+        back = self.get_page(last["previous"])
+        self.assertEqual(self.ids(back), self.ids(second))
+        self.assertIsNotNone(back["next"])
+
+        start = self.get_page(back["previous"])
+        self.assertEqual(self.ids(start), self.expected[:10])
+        self.assertIsNone(start["previous"])
+        self.assertEqual(self.get_page(start["next"]), second)
+
+    def test_invalid_cursor(self) -> None:
+        response = self.client.get(TRIP_URL, {"cursor": "invalid"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_stays_default(self) -> None:
+        page = self.get_page(TRIP_URL)
+
+        self.assertEqual(page["count"], 25)
+        self.assertEqual(self.ids(page), self.expected[:10])
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from train.models import Station
+from train.replicas import PIN_COOKIE, pin_key
+from train.tests.test_seat_map import sample_trip
+from train.views import OrderViewSet, StationViewSet, TripViewSet
+
+STATION_URL = reverse("train:station-list")
+TRIP_URL = reverse("train:trip-list")
+
+
+@override_settings(REPLICA_DATABASES=["default"])
+@mock.patch.object(StationViewSet, "throttle_classes", ())
+class CatalogReplicaTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        Station.objects.create(name="Lviv", latitude=49.84, longitude=24.03)
+
+    @mock.patch("train.replicas.random.choice", return_value="default")
+    def test_catalog_cache_is_filled_from_primary(self, choice) -> None:
+        response = self.client.get(STATION_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        choice.assert_not_called()
+
+    def test_station_create_pins_primary(self) -> None:
+        admin = get_user_model().objects.create_superuser(
+            "admin@test.com", "password123"
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.post(
+            STATION_URL,
+            {"name": "Kyiv", "latitude": 50.45, "longitude": 30.52},
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertTrue(cache.get(pin_key(admin.id)))
+
+
+@override_settings(REPLICA_DATABASES=["default"])
+@mock.patch.object(TripViewSet, "throttle_classes", ())
+@mock.patch("train.replicas.random.choice", return_value="default")
+class TokenPinTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        token = AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_unpinned_token_client_reads_replica(self, choice) -> None:
+        response = self.client.get(TRIP_URL)
+
+        self.assertEqual(response.status_code, 200)
+        choice.assert_called()
+
+    def test_pinned_token_client_reads_primary(self, choice) -> None:
+        cache.set(pin_key(self.user.id), True)
+
+        response = self.client.get(TRIP_URL)
+
+        self.assertEqual(response.status_code, 200)
+        choice.assert_not_called()
+
+    @mock.patch.object(OrderViewSet, "throttle_classes", ())
+    def test_order_pins_token_client(self, choice) -> None:
+        trip = sample_trip()
+        response = self.client.post(
+            reverse("train:order-list"),
+            {
+                "user": self.user.id,
+                "tickets": [{"trip": trip.id, "seat": 1, "luggage_weight": 1}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        # Token clients do not send the pin cookie back.
+        self.client.cookies.clear()
+        choice.reset_mock()
+
+        self.client.get(TRIP_URL)
+
+        choice.assert_not_called()
+
+    def test_invalid_token_is_not_pinned(self, choice) -> None:
+        cache.set(pin_key(self.user.id), True)
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer invalid")
+
+        response = self.client.get(TRIP_URL)
+
+        self.assertEqual(response.status_code, 200)
+        choice.assert_called()
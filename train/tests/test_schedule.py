@@ -0,0 +1,171 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from train.models import Trip
+from train.schedule import find_conflicts, overlapping_pairs
+from train.serializers import TripSerializer
+from train.tests.test_seat_map import sample_trip
+from train.views import TripViewSet
+
+CONFLICTS_URL = "/station/trips/conflicts/"
+
+
+class OverlappingPairsTests(SimpleTestCase):
+    def test_overlaps(self) -> None:
+        intervals = [(1, 5, "a"), (2, 3, "b"), (4, 8, "c"), (9, 10, "d")]
+
+        self.assertEqual(
+            sorted(overlapping_pairs(intervals)),
+            [("a", "b"), ("a", "c")],
+        )
+
+    def test_back_to_back_intervals_do_not_overlap(self) -> None:
+        intervals = [(3, 5, "b"), (1, 3, "a"), (5, 7, "c")]
+
+        self.assertEqual(list(overlapping_pairs(intervals)), [])
+
+    def test_same_interval(self) -> None:
+        self.assertEqual(
+            list(overlapping_pairs([(1, 2, "a"), (1, 2, "b")])),
+            [("a", "b")],
+        )
+
+
+class ScheduleConflictTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.trip = sample_trip()
+        self.departure = self.trip.departure_time
+        self.arrival = self.trip.arrival_time
+
+    def add_trip(self, departure, arrival, train=None) -> Trip:
+        return Trip.objects.create(
+            route=self.trip.route,
+            train=train or self.trip.train,
+            departure_time=departure,
+            arrival_time=arrival,
+        )
+
+    def test_find_conflicts(self) -> None:
+        hour = timedelta(hours=1)
+        other = sample_trip()
+        conflicts = find_conflicts(
+            [
+                ("overlap", self.trip.train_id, self.arrival - hour,
+                 self.arrival + hour),
+                ("inside", self.trip.train_id, self.arrival + 0.5 * hour,
+                 self.arrival + 0.75 * hour),
+                ("after", self.trip.train_id, self.arrival,
+                 self.arrival + 0.5 * hour),
+                ("other train", other.train_id, other.arrival_time,
+                 other.arrival_time + hour),
+            ]
+        )
+
+        self.assertEqual(
+            conflicts,
+            {
+                "overlap": {
+                    "trips": [self.trip.id],
+                    "candidates": ["after", "inside"],
+                },
+                "inside": {"trips": [], "candidates": ["overlap"]},
+                "after": {"trips": [], "candidates": ["overlap"]},
+            },
+        )
+
+    def test_find_conflicts_excludes_trips(self) -> None:
+        candidate = (None, self.trip.train_id, self.departure, self.arrival)
+
+        self.assertIn(None, find_conflicts([candidate]))
+        self.assertEqual(
+            find_conflicts([candidate], exclude=[self.trip.pk]), {}
+        )
+
+    def test_serializer_rejects_busy_train(self) -> None:
+        data = {
+            "route": self.trip.route_id,
+            "train": self.trip.train_id,
+            "departure_time": self.departure + timedelta(hours=1),
+            "arrival_time": self.arrival + timedelta(hours=1),
+        }
+
+        serializer = TripSerializer(data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(
+            serializer.errors["train"],
+            [f"The train runs trips [{self.trip.id}] at this time."],
+        )
+        # A trip does not conflict with itself when it is updated.
+        serializer = TripSerializer(self.trip, data=data)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_serializer_accepts_back_to_back_trip(self) -> None:
+        serializer = TripSerializer(
+            data={
+                "route": self.trip.route_id,
+                "train": self.trip.train_id,
+                "departure_time": self.arrival,
+                "arrival_time": self.arrival + timedelta(hours=6),
+            }
+        )
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+@mock.patch.object(TripViewSet, "throttle_classes", ())
+class ScheduleConflictsViewTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.trip = sample_trip()
+
+    def test_conflicts(self) -> None:
+        train = self.trip.train
+        hour = timedelta(hours=1)
+        second = Trip.objects.create(
+            route=self.trip.route,
+            train=train,
+            departure_time=self.trip.arrival_time - hour,
+            arrival_time=self.trip.arrival_time + hour,
+        )
+        Trip.objects.create(
+            route=self.trip.route,
+            train=train,
+            departure_time=second.arrival_time,
+            arrival_time=second.arrival_time + hour,
+        )
+        sample_trip()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password123"
+            )
+        )
+
+        response = self.client.get(CONFLICTS_URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "train": train.id,
+                    "trip": self.trip.id,
+                    "conflicting_trip": second.id,
+                }
+            ],
+        )
+
+    def test_staff_only(self) -> None:
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "password123"
+            )
+        )
+
+        self.assertEqual(self.client.get(CONFLICTS_URL).status_code, 403)
@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from train.catalog import touch_catalog, STATIONS
+from train.models import Station
+from train.search import StationNameIndex
+
+
+class StationNameIndexTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.kyiv = Station.objects.create(
+            name="Kyiv Pasazhyrskyi", latitude=50.45, longitude=30.52
+        )
+        self.lviv = Station.objects.create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        )
+        self.index = StationNameIndex()
+
+    def names(self, query) -> list[str]:
+        return [
+            suggestion["name"]
+            for suggestion in self.index.autocomplete(query)
+        ]
+
+    def test_prefix_of_any_word(self) -> None:
+        self.assertEqual(self.names("kyi"), ["Kyiv Pasazhyrskyi"])
+        self.assertEqual(self.names("PAS"), ["Kyiv Pasazhyrskyi"])
+        self.assertEqual(self.names("x"), [])
+
+    def test_substring(self) -> None:
+        self.assertEqual(self.index.substring("viv"), [self.lviv.id])
+        self.assertEqual(self.names("azh"), ["Kyiv Pasazhyrskyi"])
+
+    def test_station_save_reloads_index(self) -> None:
+        self.assertEqual(self.names("lv"), ["Lviv"])
+        self.lviv.name = "Lvov"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lviv.save()
+
+        self.assertEqual(self.names("lv"), ["Lvov"])
+
+    def test_write_in_other_worker_reloads_index(self) -> None:
+        self.assertEqual(self.names("od"), [])
+        # An update fires no signals here, like a write in another process
+        # that only replaced the shared catalog version.
+        Station.objects.filter(pk=self.lviv.pk).update(name="Odesa")
+        self.assertEqual(self.names("od"), [])
+
+        touch_catalog(STATIONS)
+
+        self.assertEqual(self.names("od"), ["Odesa"])
+        self.assertEqual(self.names("lv"), [])
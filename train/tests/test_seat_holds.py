@@ -0,0 +1,189 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from train.models import Order, SeatHold, Trip
+from train.tests.test_seat_map import sample_trip
+from train.views import OrderViewSet, SeatHoldViewSet
+
+HOLD_URL = reverse("train:seathold-list")
+ORDER_URL = reverse("train:order-list")
+
+
+@mock.patch.object(SeatHoldViewSet, "throttle_classes", ())
+class SeatHoldLimitTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        self.client.force_authenticate(self.user)
+        self.trip = sample_trip(seats_num=10)
+
+    def hold(self, seats, trip=None):
+        return self.client.post(
+            HOLD_URL,
+            {"trip": (trip or self.trip).id, "seats": seats},
+            format="json",
+        )
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=3)
+    def test_max_seats_per_user_and_trip(self) -> None:
+        self.assertEqual(self.hold([1, 2]).status_code, 201)
+
+        response = self.hold([3, 4])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["seats"],
+            ["You can hold up to 3 seats of a trip, 2 are held already."],
+        )
+        # Refreshing held seats does not count them twice.
+        self.assertEqual(self.hold([1, 2, 3]).status_code, 201)
+        self.assertEqual(
+            SeatHold.objects.filter(user=self.user).count(), 3
+        )
+
+    @override_settings(SEAT_HOLD_MAX_SEATS=1)
+    def test_expired_holds_do_not_count(self) -> None:
+        self.hold([1])
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(self.hold([2]).status_code, 201)
+
+    @override_settings(SEAT_HOLD_TTL=300, SEAT_HOLD_MAX_LIFETIME=600)
+    def test_hold_is_not_extended_past_lifetime(self) -> None:
+        self.hold([1])
+        created_at = timezone.now() - timedelta(seconds=200)
+        SeatHold.objects.update(created_at=created_at)
+
+        response = self.hold([1])
+        self.assertEqual(response.status_code, 201)
+        extended = SeatHold.objects.get().expires_at
+        self.assertGreater(extended, timezone.now() + timedelta(seconds=290))
+
+        SeatHold.objects.update(
+            created_at=created_at - timedelta(seconds=200)
+        )
+        response = self.hold([1])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(SeatHold.objects.get().expires_at, extended)
+        self.assertEqual(
+            parse_datetime(response.data["expires_at"]), extended
+        )
+
+    def test_departed_trip_cannot_be_held(self) -> None:
+        Trip.objects.filter(pk=self.trip.pk).update(
+            departure_time=timezone.now() - timedelta(minutes=1)
+        )
+
+        response = self.hold([1])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["trip"], ["The trip has already departed."]
+        )
+
+
+@mock.patch.object(OrderViewSet, "throttle_classes", ())
+@mock.patch.object(SeatHoldViewSet, "throttle_classes", ())
+class SeatHoldOrderTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        self.other = get_user_model().objects.create_user(
+            "other@test.com", "password123"
+        )
+        self.trip = sample_trip(seats_num=10)
+
+    def hold(self, user, seats):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            HOLD_URL, {"trip": self.trip.id, "seats": seats}, format="json"
+        )
+
+    def order(self, user, seats):
+        self.client.force_authenticate(user)
+        return self.client.post(
+            ORDER_URL,
+            {
+                "user": user.id,
+                "tickets": [
+                    {"trip": self.trip.id, "seat": seat, "luggage_weight": 0}
+                    for seat in seats
+                ],
+            },
+            format="json",
+        )
+
+    def test_held_seat_cannot_be_held_by_another_user(self) -> None:
+        self.hold(self.other, [2, 3])
+
+        response = self.hold(self.user, [1, 3])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["seats"], ["Seats [3] are held by another user."]
+        )
+        self.assertFalse(SeatHold.objects.filter(user=self.user).exists())
+
+    def test_held_seat_cannot_be_ordered_by_another_user(self) -> None:
+        self.hold(self.other, [3])
+
+        response = self.order(self.user, [1, 3])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["tickets"],
+            [{}, {"non_field_errors": ["The seat is held by another user."]}],
+        )
+        self.assertFalse(Order.objects.exists())
+
+    def test_expired_hold_does_not_block(self) -> None:
+        self.hold(self.other, [3])
+        SeatHold.objects.update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(self.hold(self.user, [3]).status_code, 201)
+        self.assertEqual(self.order(self.user, [3]).status_code, 201)
+
+    def test_order_releases_own_holds(self) -> None:
+        self.hold(self.user, [1, 2])
+        self.hold(self.other, [5])
+
+        response = self.order(self.user, [1, 2])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(SeatHold.objects.values_list("user", "seat")),
+            [(self.other.id, 5)],
+        )
+        self.assertEqual(
+            Trip.objects.get(pk=self.trip.pk).seats_taken, [1, 2]
+        )
+
+    @override_settings(SEAT_HOLD_REQUIRED=True)
+    def test_hold_required_before_order(self) -> None:
+        response = self.order(self.user, [4])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["tickets"],
+            [{"non_field_errors": ["Hold the seat before ordering it."]}],
+        )
+
+        self.hold(self.user, [4])
+        self.assertEqual(self.order(self.user, [4]).status_code, 201)
@@ -0,0 +1,178 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from train.models import (
+    Order,
+    Route,
+    Station,
+    Ticket,
+    Train,
+    TrainType,
+    Trip,
+)
+from train.seat_map import SeatMap
+from train.views import TripViewSet
+
+
+def sample_trip(seats_num=10) -> Trip:
+    train = Train.objects.create(
+        name="Intercity 1",
+        luggage_space=30,
+        seats_num=seats_num,
+        train_type=TrainType.objects.create(name="Intercity"),
+    )
+    route = Route.objects.create(
+        name="Lviv - Kyiv",
+        source=Station.objects.create(
+            name="Lviv", latitude=49.84, longitude=24.03
+        ),
+        destination=Station.objects.create(
+            name="Kyiv", latitude=50.45, longitude=30.52
+        ),
+        distance=540,
+    )
+    departure = timezone.now() + timedelta(days=1)
+    return Trip.objects.create(
+        route=route,
+        train=train,
+        departure_time=departure,
+        arrival_time=departure + timedelta(hours=6),
+    )
+
+
+class SeatMapTests(SimpleTestCase):
+    def test_occupy_and_release(self) -> None:
+        seat_map = SeatMap(size=10)
+        seat_map.occupy([1, 3, 10])
+
+        self.assertEqual(seat_map.seats(), [1, 3, 10])
+        self.assertEqual(len(seat_map), 3)
+        self.assertEqual(seat_map.free_count(), 7)
+        self.assertIn(10, seat_map)
+        self.assertNotIn(2, seat_map)
+        self.assertNotIn(0, seat_map)
+
+        seat_map.release([3, 5])
+        self.assertEqual(seat_map.seats(), [1, 10])
+
+    def test_bytes_round_trip(self) -> None:
+        seat_map = SeatMap(size=20)
+        seat_map.occupy([2, 9, 20])
+
+        data = seat_map.to_bytes()
+        self.assertEqual(len(data), 3)
+        self.assertEqual(SeatMap(data, 20).seats(), [2, 9, 20])
+        self.assertEqual(SeatMap(b"", 20).seats(), [])
+
+    def test_free_seats(self) -> None:
+        seat_map = SeatMap(size=8)
+        seat_map.occupy([1, 2, 4])
+
+        self.assertEqual(seat_map.free_seats(3), [3, 5, 6])
+        self.assertEqual(seat_map.free_seats(4, together=True), [5, 6, 7, 8])
+        self.assertEqual(seat_map.free_seats(5, together=True), [])
+        self.assertEqual(seat_map.free_seats(6), [])
+        self.assertEqual(seat_map.free_seats(0), [])
+
+    def test_free_count_is_not_negative(self) -> None:
+        seat_map = SeatMap(size=2)
+        seat_map.occupy([1, 2, 3])
+
+        self.assertEqual(seat_map.free_count(), 0)
+
+
+class TripSeatMapTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            "user@test.com", "password123"
+        )
+        self.trip = sample_trip(seats_num=10)
+        self.order = Order.objects.create(user=self.user)
+
+    def book(self, seat) -> Ticket:
+        return Ticket.objects.create(
+            order=self.order, trip=self.trip, seat=seat, luggage_weight=5
+        )
+
+    def assert_seats(self, taken) -> None:
+        trip = Trip.objects.get(pk=self.trip.pk)
+        self.assertEqual(trip.seats_taken, taken)
+        self.assertEqual(trip.sold_seats, len(taken))
+        self.assertEqual(trip.available_seats, 10 - len(taken))
+
+    def test_ticket_create_occupies_seat(self) -> None:
+        self.book(4)
+        self.book(2)
+
+        self.assert_seats([2, 4])
+
+    def test_ticket_seat_change_moves_seat(self) -> None:
+        ticket = self.book(4)
+        ticket.seat = 7
+        ticket.save()
+
+        self.assert_seats([7])
+
+    def test_ticket_delete_releases_seat(self) -> None:
+        self.book(4)
+        self.book(5).delete()
+
+        self.assert_seats([4])
+
+    def test_order_delete_releases_seats(self) -> None:
+        self.book(4)
+        self.book(5)
+        self.order.delete()
+
+        self.assert_seats([])
+
+    def test_stale_trip_save_keeps_bookings(self) -> None:
+        stale = Trip.objects.get(pk=self.trip.pk)
+        self.book(4)
+        stale.arrival_time += timedelta(hours=1)
+        stale.save()
+
+        self.assert_seats([4])
+        self.assertEqual(
+            Trip.objects.get(pk=self.trip.pk).arrival_time,
+            stale.arrival_time,
+        )
+
+    def test_trip_train_change_updates_available_seats(self) -> None:
+        self.book(4)
+        self.trip.refresh_from_db()
+        self.trip.train = Train.objects.create(
+            name="Intercity 2",
+            luggage_space=30,
+            seats_num=50,
+            train_type=self.trip.train.train_type,
+        )
+        self.trip.save()
+
+        self.assertEqual(self.trip.available_seats, 49)
+        self.assertEqual(
+            Trip.objects.get(pk=self.trip.pk).available_seats, 49
+        )
+
+    @mock.patch.object(TripViewSet, "throttle_classes", ())
+    def test_trip_detail_reads_seat_map(self) -> None:
+        self.book(1)
+        self.book(3)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get(
+            reverse("train:trip-detail", args=[self.trip.id])
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["taken_seats"], [1, 3])
+        self.assertEqual(response.data["available_seats"], 8)
@@ -0,0 +1,298 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from train.models import Trip
+from train.tests.test_seat_map import sample_trip
+from train.views import TripViewSet
+
+IMPORT_URL = "/station/trips/import/"
+CSV_TIMETABLE = (
+    "route,train,departure_time,arrival_time\n"
+    "Lviv - Kyiv,Intercity 1,2030-01-01T08:00:00,2030-01-01T14:00:00\n"
+    "{route},{train},2030-01-02T08:00:00,2030-01-02T14:00:00\n"
+)
+
+
+@mock.patch.object(TripViewSet, "throttle_classes", ())
+class TimetableImportTests(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_superuser(
+                "admin@test.com", "password123"
+            )
+        )
+        self.trip = sample_trip()
+
+    def row(self, departure, arrival, **fields) -> dict:
+        return {
+            "route": "Lviv - Kyiv",
+            "train": "Intercity 1",
+            "departure_time": departure,
+            "arrival_time": arrival,
+            **fields,
+        }
+
+    def test_import_json(self) -> None:
+        response = self.client.post(
+            IMPORT_URL,
+            [
+                self.row("2030-01-01T08:00:00", "2030-01-01T14:00:00"),
+                self.row(
+                    "2030-01-02T08:00:00+00:00",
+                    "2030-01-02T14:00:00+00:00",
+                    route=str(self.trip.route_id),
+                    train=str(self.trip.train_id),
+                ),
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            response.data, {"rows": 2, "created": 2, "errors": []}
+        )
+        imported = Trip.objects.exclude(pk=self.trip.pk)
+        self.assertEqual(imported.count(), 2)
+        for trip in imported:
+            self.assertEqual(trip.available_seats, 10)
+            self.assertEqual(trip.route_id, self.trip.route_id)
+
+    def test_import_csv_upload(self) -> None:
+        upload = SimpleUploadedFile(
+            "timetable.csv",
+            CSV_TIMETABLE.format(
+                route=self.trip.route_id, train=self.trip.train_id
+            ).encode(),
+        )
+
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["created"], 2)
+
+    def test_dry_run(self) -> None:
+        response = self.client.post(
+            IMPORT_URL + "?dry_run=true",
+            [self.row("2030-01-01T08:00:00", "2030-01-01T14:00:00")],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data, {"rows": 1, "created": 0, "errors": []}
+        )
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_invalid_row_rolls_back_import(self) -> None:
+        response = self.client.post(
+            IMPORT_URL,
+            [
+                self.row("2030-01-01T08:00:00", "2030-01-01T14:00:00"),
+                self.row(
+                    "2030-01-02T08:00:00",
+                    "2030-01-02T07:00:00",
+                    route="Odesa - Kyiv",
+                ),
+                self.row("tomorrow", "", train=""),
+                "not a trip",
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["rows"], 4)
+        self.assertEqual(response.data["created"], 0)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 2,
+                    "errors": {
+                        "route": ['Unknown route "Odesa - Kyiv".'],
+                        "arrival_time": [
+                            "Arrival time must be greater than departure "
+                            "time."
+                        ],
+                    },
+                },
+                {
+                    "row": 3,
+                    "errors": {
+                        "train": ["This field is required."],
+                        "departure_time": [
+                            "A valid ISO 8601 datetime is required."
+                        ],
+                        "arrival_time": [
+                            "A valid ISO 8601 datetime is required."
+                        ],
+                    },
+                },
+                {
+                    "row": 4,
+                    "errors": {"non_field_errors": ["Expected a trip."]},
+                },
+            ],
+        )
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_conflicting_rows(self) -> None:
+        departure = self.trip.departure_time + timedelta(hours=5)
+        response = self.client.post(
+            IMPORT_URL,
+            [
+                self.row("2030-01-01T08:00:00", "2030-01-01T14:00:00"),
+                self.row("2030-01-01T13:00:00", "2030-01-01T18:00:00"),
+                self.row(
+                    departure.isoformat(),
+                    (departure + timedelta(hours=2)).isoformat(),
+                ),
+                # Back-to-back with the first row.
+                self.row("2030-01-01T14:00:00", "2030-01-01T15:00:00"),
+            ],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {
+                    "row": 1,
+                    "errors": {
+                        "train": [
+                            "The train is also used in rows [2] at this "
+                            "time."
+                        ]
+                    },
+                },
+                {
+                    "row": 2,
+                    "errors": {
+                        "train": [
+                            "The train is also used in rows [1, 4] at "
+                            "this time."
+                        ]
+                    },
+                },
+                {
+                    "row": 3,
+                    "errors": {
+                        "train": [
+                            f"The train runs trips [{self.trip.id}] at "
+                            "this time."
+                        ]
+                    },
+                },
+                {
+                    "row": 4,
+                    "errors": {
+                        "train": [
+                            "The train is also used in rows [2] at this "
+                            "time."
+                        ]
+                    },
+                },
+            ],
+        )
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_ambiguous_name(self) -> None:
+        sample_trip()
+
+        response = self.client.post(
+            IMPORT_URL,
+            [self.row("2030-01-01T08:00:00", "2030-01-01T14:00:00")],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["errors"][0]["errors"]["route"],
+            ['2 routes are named "Lviv - Kyiv", use the id.'],
+        )
+
+    def test_invalid_file(self) -> None:
+        upload = SimpleUploadedFile("timetable.xml", b"<trips/>")
+
+        response = self.client.post(
+            IMPORT_URL, {"file": upload}, format="multipart"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["file"], ["Expected one of: csv, json."]
+        )
+
+    def test_staff_only(self) -> None:
+        self.client.force_authenticate(
+            get_user_model().objects.create_user(
+                "user@test.com", "password123"
+            )
+        )
+
+        response = self.client.post(IMPORT_URL, [], format="json")
+
+        self.assertEqual(response.status_code, 403)
+
+
+class ImportTimetableCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.trip = sample_trip()
+
+    def import_timetable(self, content, *args) -> str:
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".csv", delete=False
+        ) as file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+
+        stdout = StringIO()
+        call_command(
+            "import_timetable",
+            file.name,
+            *args,
+            stdout=stdout,
+            stderr=StringIO(),
+        )
+        return stdout.getvalue()
+
+    def test_import(self) -> None:
+        output = self.import_timetable(
+            CSV_TIMETABLE.format(route="Lviv - Kyiv", train="Intercity 1")
+        )
+
+        self.assertIn("Imported 2 trips.", output)
+        self.assertEqual(Trip.objects.count(), 3)
+
+    def test_dry_run(self) -> None:
+        output = self.import_timetable(
+            CSV_TIMETABLE.format(route="Lviv - Kyiv", train="Intercity 1"),
+            "--dry-run",
+        )
+
+        self.assertIn("All 2 rows are valid.", output)
+        self.assertEqual(Trip.objects.count(), 1)
+
+    def test_invalid_row(self) -> None:
+        with self.assertRaisesMessage(
+            CommandError, "1 of 2 rows are invalid, nothing was imported."
+        ):
+            self.import_timetable(
+                CSV_TIMETABLE.format(route="Lviv - Kyiv", train="Unknown")
+            )
+
+        self.assertEqual(Trip.objects.count(), 1)
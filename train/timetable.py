@@ -0,0 +1,195 @@
+import csv
+import json
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from train.models import Route, Train, Trip
+from train.schedule import find_conflicts
+
+FORMATS = ("csv", "json")
+
+
+def read_timetable(content, input_format) -> list[dict]:
+    """Rows of a CSV file with a header line or of a JSON list."""
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig")
+
+    if input_format == "csv":
+        try:
+            return list(csv.DictReader(content.splitlines()))
+        except csv.Error as error:
+            raise ValueError(f"Invalid CSV: {error}.")
+    if input_format == "json":
+        rows = json.loads(content)
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON list of trips.")
+        return rows
+    raise ValueError(f"Expected one of: {', '.join(FORMATS)}.")
+
+
+def parse_time(value):
+    value = parse_datetime(str(value).strip()) if value else None
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+class TimetableImport:
+    """Validate timetable rows as a whole and insert them in batches.
+
+    Route and train names (or ids) are resolved with one query per model,
+    all departure/arrival pairs are compared in a single numpy pass and
+    nothing is written unless every row is valid.
+    """
+
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.errors = {}
+        self.trips = []
+
+    def add_error(self, index, field, message) -> None:
+        self.errors.setdefault(index, {}).setdefault(field, []).append(
+            message
+        )
+
+    def resolve(self, model, field) -> list:
+        """Primary keys for the ``field`` column, ``None`` on error."""
+        values = [
+            str(row.get(field) or "").strip()
+            if isinstance(row, dict) else ""
+            for row in self.rows
+        ]
+        wanted = set(values) - {""}
+        ids = model.objects.filter(
+            pk__in={int(value) for value in wanted if value.isdigit()}
+        ).values_list("pk", flat=True)
+        keys = {str(pk): [pk] for pk in ids}
+        names = model.objects.filter(name__in=wanted - set(keys))
+        for pk, name in names.values_list("pk", "name"):
+            keys.setdefault(name, []).append(pk)
+
+        resolved = []
+        for index, value in enumerate(values):
+            found = keys.get(value, [])
+            if not value:
+                self.add_error(index, field, "This field is required.")
+            elif not found:
+                self.add_error(index, field, f"Unknown {field} \"{value}\".")
+            elif len(found) > 1:
+                self.add_error(
+                    index,
+                    field,
+                    f"{len(found)} {field}s are named \"{value}\", "
+                    "use the id.",
+                )
+            resolved.append(found[0] if len(found) == 1 else None)
+        return resolved
+
+    def parse_times(self, field) -> list:
+        parsed = []
+        for index, row in enumerate(self.rows):
+            value = row.get(field) if isinstance(row, dict) else None
+            try:
+                parsed.append(parse_time(value))
+            except ValueError:
+                parsed.append(None)
+            if parsed[-1] is None:
+                self.add_error(
+                    index, field, "A valid ISO 8601 datetime is required."
+                )
+        return parsed
+
+    def validate(self) -> bool:
+        route_ids = self.resolve(Route, "route")
+        train_ids = self.resolve(Train, "train")
+        departures = self.parse_times("departure_time")
+        arrivals = self.parse_times("arrival_time")
+
+        def timestamps(values):
+            return np.array(
+                [value.timestamp() if value else np.nan for value in values],
+                dtype=float,
+            ).reshape(-1)
+
+        # NaN comparisons are false, unparsed rows are reported above.
+        for index in np.flatnonzero(
+            timestamps(arrivals) <= timestamps(departures)
+        ):
+            self.add_error(
+                int(index),
+                "arrival_time",
+                "Arrival time must be greater than departure time.",
+            )
+
+        self.check_conflicts(train_ids, departures, arrivals)
+
+        for index, row in enumerate(self.rows):
+            if not isinstance(row, dict):
+                self.errors[index] = {"non_field_errors": ["Expected a trip."]}
+
+        if self.errors:
+            return False
+
+        seats = dict(
+            Train.objects.filter(pk__in=set(train_ids)).values_list(
+                "pk", "seats_num"
+            )
+        )
+        self.trips = [
+            Trip(
+                route_id=route_id,
+                train_id=train_id,
+                departure_time=departure,
+                arrival_time=arrival,
+                available_seats=seats[train_id],
+            )
+            for route_id, train_id, departure, arrival in zip(
+                route_ids, train_ids, departures, arrivals
+            )
+        ]
+        return True
+
+    def check_conflicts(self, train_ids, departures, arrivals) -> None:
+        """Report trains used twice at once by the valid rows or by a row
+        and a saved trip."""
+        candidates = [
+            (index, train_id, departure, arrival)
+            for index, (train_id, departure, arrival) in enumerate(
+                zip(train_ids, departures, arrivals)
+            )
+            if train_id and departure and arrival and arrival > departure
+        ]
+        for index, found in find_conflicts(candidates).items():
+            if found["trips"]:
+                self.add_error(
+                    index,
+                    "train",
+                    f"The train runs trips {sorted(found['trips'])} at "
+                    "this time.",
+                )
+            if found["candidates"]:
+                rows = sorted(other + 1 for other in found["candidates"])
+                self.add_error(
+                    index,
+                    "train",
+                    f"The train is also used in rows {rows} at this time.",
+                )
+
+    def save(self, batch_size=1000) -> int:
+        with transaction.atomic():
+            Trip.objects.bulk_create(self.trips, batch_size=batch_size)
+        return len(self.trips)
+
+    def report(self, created=0) -> dict:
+        """Row numbers start at 1 with the first trip, not the header."""
+        return {
+            "rows": len(self.rows),
+            "created": created,
+            "errors": [
+                {"row": index + 1, "errors": errors}
+                for index, errors in sorted(self.errors.items())
+            ],
+        }
@@ -1,13 +1,24 @@
+from django.urls import path
 from rest_framework import routers
 
+from train.async_views import (
+    AsyncTripListView,
+    AsyncTripDetailView,
+    AsyncRouteListView,
+    AsyncOrderCreateView,
+)
+
 from train.views import (
     TrainTypeViewSet,
     TrainViewSet,
     StationViewSet,
     RouteViewSet,
+    JourneyViewSet,
     CrewViewSet,
     OrderViewSet,
     TripViewSet,
+    SeatHoldViewSet,
+    ExportViewSet,
 )
 
 router = routers.DefaultRouter()
@@ -15,11 +26,33 @@ router.register("train-types", TrainTypeViewSet)
 router.register("trains", TrainViewSet)
 router.register("stations", StationViewSet)
 router.register("routes", RouteViewSet)
+router.register("journeys", JourneyViewSet, basename="journey")
 router.register("crews", CrewViewSet)
 router.register("orders", OrderViewSet)
 router.register("trips", TripViewSet)
+router.register("holds", SeatHoldViewSet)
+router.register("exports", ExportViewSet, basename="export")
 
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "async/trips/", AsyncTripListView.as_view(), name="async-trip-list"
+    ),
+    path(
+        "async/trips/<int:pk>/",
+        AsyncTripDetailView.as_view(),
+        name="async-trip-detail",
+    ),
+    path(
+        "async/routes/",
+        AsyncRouteListView.as_view(),
+        name="async-route-list",
+    ),
+    path(
+        "async/orders/",
+        AsyncOrderCreateView.as_view(),
+        name="async-order-create",
+    ),
+]
 
 app_name = "train"
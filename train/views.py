@@ -1,18 +1,32 @@
+import os
 from typing import Type
 
-from django.db.models import QuerySet, Count, F
-from rest_framework import viewsets, mixins
+from django.db.models import Count, Max, Min, Prefetch, QuerySet
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, mixins, status
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.serializers import Serializer
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from user.authentication import CachedJWTAuthentication
 
+from train.catalog import CatalogCacheMixin, STATIONS, ROUTES
+from train.exports import export_response
+from train.filters import filter_routes, filter_trips, filter_timetable
+from train.geo import station_locator
+from train.journeys import route_graph
+from train.pagination import StandardPagination, KeysetPaginationMixin
 from train.permissions import IsAdminOrReadOnly
+from train.replicas import ReplicaReadMixin, PrimaryPinMixin
+from train.schedule import schedule_conflicts
+from train.search import station_index
+from train.timetable import TimetableImport, read_timetable
 from train.models import (
     TrainType,
     Train,
@@ -21,27 +35,59 @@ from train.models import (
     Crew,
     Order,
     Trip,
+    Ticket,
+    SeatHold,
 )
 from train.serializers import (
     TrainTypeSerializer,
     TrainSerializer,
     TrainRetrieveSerializer,
+    TrainTimetableSerializer,
     StationSerializer,
+    StationAutocompleteSerializer,
+    StationNearbySerializer,
     RouteSerializer,
     RouteListSerializer,
+    JourneySerializer,
+    ScheduleConflictSerializer,
     CrewSerializer,
     CrewListSerializer,
     OrderSerializer,
+    OrderAllocateSerializer,
     OrderListSerializer,
     TripSerializer,
     TripListSerializer,
     TripRetrieveSerializer,
+    SeatHoldSerializer,
+    SeatHoldCreateSerializer,
 )
 
 
-class StandardPagination(PageNumberPagination):
-    page_size = 10
-    max_page_size = 100
+EXPORT_PARAMETERS = [
+    OpenApiParameter(
+        "output",
+        type=OpenApiTypes.STR,
+        enum=["ndjson", "csv"],
+        description="Export format, ndjson by default (ex. ?output=csv)",
+    ),
+]
+
+CURSOR_PARAMETERS = [
+    OpenApiParameter(
+        "pagination",
+        type=OpenApiTypes.STR,
+        enum=["cursor"],
+        description=(
+            "Switch to cursor pagination, pages are followed through "
+            "the next/previous links (ex. ?pagination=cursor)"
+        ),
+    ),
+    OpenApiParameter(
+        "cursor",
+        type=OpenApiTypes.STR,
+        description="Cursor from a next/previous link",
+    ),
+]
 
 
 class TrainTypeViewSet(
@@ -50,7 +96,7 @@ class TrainTypeViewSet(
     queryset = TrainType.objects.all()
     serializer_class = TrainTypeSerializer
     permission_classes = (IsAdminUser,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
 
 
 class TrainViewSet(viewsets.ModelViewSet):
@@ -58,32 +104,193 @@ class TrainViewSet(viewsets.ModelViewSet):
     serializer_class = TrainSerializer
     pagination_class = StandardPagination
     permission_classes = (IsAdminUser,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
 
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action == "retrieve":
             return TrainRetrieveSerializer
+        if self.action == "timetable":
+            return TrainTimetableSerializer
         return TrainSerializer
 
     def get_queryset(self) -> Type[QuerySet]:
         queryset = self.queryset
         if self.action == "retrieve":
-            queryset = queryset.prefetch_related("trips")
+            queryset = queryset.annotate(
+                trip_count=Count("trips"),
+                first_departure=Min("trips__departure_time"),
+                last_departure=Max("trips__departure_time"),
+            )
         return queryset
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.DATE,
+                description="First departure date (ex. ?from=2023-08-01)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.DATE,
+                description="Last departure date (ex. ?to=2023-08-31)",
+            ),
+        ],
+        responses=TrainTimetableSerializer(many=True),
+    )
+    @action(detail=True, methods=["GET"], url_path="timetable")
+    def timetable(self, request, pk=None) -> Response:
+        """Trips of the train in departure order, one page at a time."""
+        train = self.get_object()
+        trips = filter_timetable(
+            Trip.objects.filter(train=train)
+            .defer("seat_map")
+            .order_by("departure_time", "id"),
+            request.query_params,
+        )
+
+        page = self.paginate_queryset(trips)
+        for trip in page:
+            trip.train = train
+        return self.get_paginated_response(
+            TrainTimetableSerializer(page, many=True).data
+        )
+
 
 class StationViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    ReplicaReadMixin,
+    PrimaryPinMixin,
+    CatalogCacheMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
+    catalog = STATIONS
     queryset = Station.objects.all()
     serializer_class = StationSerializer
     permission_classes = (IsAdminOrReadOnly,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
+    max_suggestions = 20
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Start of a station name word (ex. ?q=ky)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of suggestions, up to 20 (ex. ?limit=5)",
+            ),
+        ],
+        responses=StationAutocompleteSerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="autocomplete",
+        serializer_class=StationAutocompleteSerializer,
+    )
+    def autocomplete(self, request) -> Response:
+        try:
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            raise ValidationError({"limit": ["A valid integer is required."]})
+        limit = min(max(limit, 1), self.max_suggestions)
+
+        suggestions = station_index.autocomplete(
+            request.query_params.get("q", ""), limit=limit
+        )
+        return Response(
+            StationAutocompleteSerializer(suggestions, many=True).data
+        )
+
+    @staticmethod
+    def get_float_param(request, param, minimum, maximum, default=None):
+        value = request.query_params.get(param, default)
+        if value is None:
+            raise ValidationError(
+                {param: ["This query parameter is required."]}
+            )
+        try:
+            value = float(value)
+        except ValueError:
+            raise ValidationError({param: ["A valid number is required."]})
+        if not minimum <= value <= maximum:
+            raise ValidationError(
+                {param: [f"Must be in range [{minimum}, {maximum}]."]}
+            )
+        return value
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Latitude in degrees (ex. ?lat=49.84)",
+            ),
+            OpenApiParameter(
+                "lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Longitude in degrees (ex. ?lon=24.03)",
+            ),
+            OpenApiParameter(
+                "radius",
+                type=OpenApiTypes.FLOAT,
+                description="Search radius in km, 50 by default "
+                            "(ex. ?radius=10)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description="Number of stations, up to 100 (ex. ?limit=5)",
+            ),
+        ],
+        responses=StationNearbySerializer(many=True),
+    )
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="nearby",
+        serializer_class=StationNearbySerializer,
+    )
+    def nearby(self, request) -> Response:
+        latitude = self.get_float_param(request, "lat", -90, 90)
+        longitude = self.get_float_param(request, "lon", -180, 180)
+        radius = self.get_float_param(
+            request, "radius", 0, 20_000, default=50
+        )
+        limit = int(self.get_float_param(request, "limit", 1, 100, default=10))
+
+        found = station_locator.nearby(latitude, longitude, radius, limit)
+        stations = Station.objects.in_bulk([pk for pk, _ in found])
+        nearby = []
+        for pk, distance in found:
+            if pk in stations:
+                stations[pk].distance = round(distance, 3)
+                nearby.append(stations[pk])
+
+        return Response(
+            StationNearbySerializer(
+                nearby, many=True, context={"request": request}
+            ).data
+        )
 
 
 class RouteViewSet(
-    mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
+    ReplicaReadMixin,
+    PrimaryPinMixin,
+    CatalogCacheMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    viewsets.GenericViewSet,
 ):
+    catalog = ROUTES
     queryset = Route.objects.all()
     serializer_class = RouteSerializer
     pagination_class = StandardPagination
@@ -96,19 +303,7 @@ class RouteViewSet(
         return RouteSerializer
 
     def get_queryset(self) -> Type[QuerySet]:
-        queryset = self.queryset
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-
-        if source:
-            queryset = queryset.filter(source__name__icontains=source)
-
-        if destination:
-            queryset = queryset.filter(
-                destination__name__icontains=destination
-            )
-
-        return queryset
+        return filter_routes(self.queryset, self.request.query_params)
 
     @extend_schema(
         parameters=[
@@ -126,19 +321,94 @@ class RouteViewSet(
                         "(ex. ?destination=kyiv)"
                 ),
             ),
+            OpenApiParameter(
+                "match",
+                type=OpenApiTypes.STR,
+                enum=["prefix", "substring"],
+                description=(
+                        "Match station names through the name index by "
+                        "word prefix or substring instead of a "
+                        "database scan (ex. ?source=ky&match=prefix)"
+                ),
+            ),
         ]
     )
     def list(self, request, *args, **kwargs) -> Response:
         return super().list(request, *args, **kwargs)
 
 
+class JourneyViewSet(viewsets.ViewSet):
+    permission_classes = (IsAdminOrReadOnly,)
+    authentication_classes = []
+    max_journeys = 5
+
+    def get_station(self, param) -> int:
+        value = self.request.query_params.get(param)
+        if not value:
+            raise ValidationError(
+                {param: ["This query parameter is required."]}
+            )
+
+        station_id = route_graph.find_station(value)
+        if station_id is None:
+            raise ValidationError({param: [f"Unknown station \"{value}\"."]})
+        return station_id
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "from",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Departure station name or id (ex. ?from=lviv)",
+            ),
+            OpenApiParameter(
+                "to",
+                type=OpenApiTypes.STR,
+                required=True,
+                description="Arrival station name or id (ex. ?to=odesa)",
+            ),
+            OpenApiParameter(
+                "k",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Number of shortest journeys to return, up to 5 "
+                    "(ex. ?k=3)"
+                ),
+            ),
+        ],
+        responses=JourneySerializer(many=True),
+    )
+    def list(self, request) -> Response:
+        source_id = self.get_station("from")
+        destination_id = self.get_station("to")
+        if source_id == destination_id:
+            raise ValidationError(
+                {"to": ["Arrival station must differ from departure."]}
+            )
+
+        try:
+            k = int(request.query_params.get("k", 1))
+        except ValueError:
+            raise ValidationError({"k": ["A valid integer is required."]})
+        k = min(max(k, 1), self.max_journeys)
+
+        journeys = [
+            route_graph.describe(distance, path)
+            for distance, path in route_graph.k_shortest_paths(
+                source_id, destination_id, k
+            )
+        ]
+        return Response(JourneySerializer(journeys, many=True).data)
+
+
 class CrewViewSet(
     mixins.ListModelMixin, mixins.CreateModelMixin, viewsets.GenericViewSet
 ):
     queryset = Crew.objects.prefetch_related("assigned_trips")
     serializer_class = CrewSerializer
     permission_classes = (IsAdminUser,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
 
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action == "list":
@@ -146,12 +416,13 @@ class CrewViewSet(
         return CrewSerializer
 
 
-class TripViewSet(viewsets.ModelViewSet):
-    queryset = Trip.objects.prefetch_related("train__train_type").order_by(
-        "departure_time"
-    )
+class TripViewSet(
+    ReplicaReadMixin, KeysetPaginationMixin, viewsets.ModelViewSet
+):
+    queryset = Trip.objects.order_by("departure_time")
     serializer_class = TripSerializer
     pagination_class = StandardPagination
+    cursor_ordering = ("departure_time", "id")
     permission_classes = (IsAdminOrReadOnly,)
     authentication_classes = []
 
@@ -163,25 +434,7 @@ class TripViewSet(viewsets.ModelViewSet):
         return TripSerializer
 
     def get_queryset(self) -> Type[QuerySet]:
-        queryset = self.queryset
-        departure = self.request.query_params.get("departure")
-        arrival = self.request.query_params.get("arrival")
-        route = self.request.query_params.get("route")
-
-        if departure:
-            queryset = queryset.filter(departure_time__date=departure)
-
-        if arrival:
-            queryset = queryset.filter(arrival_time__date=arrival)
-
-        if route:
-            queryset = queryset.filter(route__name__icontains=route)
-
-        if self.action in ["list", "retrieve"]:
-            queryset = queryset.prefetch_related("train").annotate(
-                available_seats=F("train__seats_num") - Count("tickets")
-            )
-        return queryset
+        return filter_trips(self.queryset, self.request.query_params)
 
     @extend_schema(
         parameters=[
@@ -206,32 +459,246 @@ class TripViewSet(viewsets.ModelViewSet):
                     "Filter by route name "
                     "(ex. ?route=lviv)"
                 )
-            )
+            ),
+            OpenApiParameter(
+                "min_seats",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Filter by minimum number of available seats "
+                    "(ex. ?min_seats=2)"
+                )
+            ),
+            OpenApiParameter(
+                "ordering",
+                type=OpenApiTypes.STR,
+                enum=["available_seats", "-available_seats"],
+                description=(
+                    "Sort by available seats, ignored in cursor mode "
+                    "(ex. ?ordering=-available_seats)"
+                )
+            ),
+            *CURSOR_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs) -> Response:
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(responses=ScheduleConflictSerializer(many=True))
+    @action(
+        detail=False,
+        methods=["GET"],
+        url_path="conflicts",
+        permission_classes=(IsAdminUser,),
+        authentication_classes=(CachedJWTAuthentication,),
+    )
+    def conflicts(self, request) -> Response:
+        """Every pair of trips that use one train at the same time."""
+        conflicts = [
+            {"train": train_id, "trip": first, "conflicting_trip": second}
+            for train_id, first, second in schedule_conflicts()
+        ]
+        return Response(ScheduleConflictSerializer(conflicts, many=True).data)
+
+    @extend_schema(
+        request={
+            "multipart/form-data": {
+                "type": "object",
+                "properties": {"file": {"type": "string", "format": "binary"}},
+            },
+            "application/json": {"type": "array", "items": {"type": "object"}},
+        },
+        parameters=[
+            OpenApiParameter(
+                "dry_run",
+                type=OpenApiTypes.BOOL,
+                description="Only validate the timetable (ex. ?dry_run=true)",
+            ),
+        ],
+        responses={(201, "application/json"): OpenApiTypes.OBJECT},
+    )
+    @action(
+        detail=False,
+        methods=["POST"],
+        url_path="import",
+        permission_classes=(IsAdminUser,),
+        authentication_classes=(CachedJWTAuthentication,),
+        parser_classes=(MultiPartParser, JSONParser),
+    )
+    def import_timetable(self, request) -> Response:
+        """Create trips from a CSV/JSON file upload or a JSON list with
+        route, train, departure_time and arrival_time of each trip."""
+        upload = request.FILES.get("file")
+        try:
+            if upload is not None:
+                extension = os.path.splitext(upload.name)[1]
+                rows = read_timetable(upload.read(), extension[1:].lower())
+            elif isinstance(request.data, list):
+                rows = request.data
+            else:
+                raise ValueError("Upload a file or send a JSON list.")
+        except ValueError as error:
+            raise ValidationError({"file": [str(error)]})
+
+        timetable = TimetableImport(rows)
+        if not timetable.validate():
+            return Response(
+                timetable.report(), status=status.HTTP_400_BAD_REQUEST
+            )
+        if request.query_params.get("dry_run") == "true":
+            return Response(timetable.report())
+        return Response(
+            timetable.report(created=timetable.save()),
+            status=status.HTTP_201_CREATED,
+        )
+
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(
+    PrimaryPinMixin, KeysetPaginationMixin, viewsets.ModelViewSet
+):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = StandardPagination
+    cursor_ordering = ("created_at", "id")
     permission_classes = (IsAuthenticated,)
-    authentication_classes = (JWTAuthentication,)
+    authentication_classes = (CachedJWTAuthentication,)
+    throttle_scope = "booking"
+    # Bookings lock the trip row, they use up the limits faster than reads.
+    throttle_costs = {"create": 5, "allocate": 5}
 
     def get_queryset(self) -> Type[QuerySet]:
         queryset = self.queryset.filter(user=self.request.user)
 
-        if self.action == "list":
-            queryset = queryset.prefetch_related("tickets__trip__train")
+        if self.action in ["list", "retrieve"]:
+            queryset = queryset.prefetch_related(
+                Prefetch(
+                    "tickets",
+                    queryset=Ticket.objects.select_related("trip").defer(
+                        "trip__seat_map"
+                    ),
+                )
+            )
 
         return queryset
 
     def get_serializer_class(self) -> Type[Serializer]:
         if self.action in ["list", "retrieve"]:
             return OrderListSerializer
+        if self.action == "allocate":
+            return OrderAllocateSerializer
         return OrderSerializer
 
     def perform_create(self, serializer) -> None:
         serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=["POST"], url_path="allocate")
+    def allocate(self, request) -> Response:
+        """Order tickets for a number of passengers, seats are chosen by
+        the server."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(parameters=CURSOR_PARAMETERS)
+    def list(self, request, *args, **kwargs) -> Response:
+        return super().list(request, *args, **kwargs)
+
+
+class SeatHoldViewSet(
+    PrimaryPinMixin,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    queryset = SeatHold.objects.all()
+    serializer_class = SeatHoldSerializer
+    permission_classes = (IsAuthenticated,)
+    authentication_classes = (CachedJWTAuthentication,)
+    throttle_scope = "booking"
+    throttle_costs = {"create": 2}
+
+    def get_queryset(self) -> Type[QuerySet]:
+        return self.queryset.active().filter(user=self.request.user)
+
+    def get_serializer_class(self) -> Type[Serializer]:
+        if self.action == "create":
+            return SeatHoldCreateSerializer
+        return SeatHoldSerializer
+
+    def perform_create(self, serializer) -> None:
+        serializer.save(user=self.request.user)
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """Staff-only streaming dumps of whole tables for reconciliation."""
+
+    permission_classes = (IsAdminUser,)
+    authentication_classes = (CachedJWTAuthentication,)
+
+    def export(self, queryset, fields, name) -> StreamingHttpResponse:
+        return export_response(
+            queryset,
+            fields,
+            self.request.query_params.get("output", "ndjson"),
+            name,
+        )
+
+    @extend_schema(
+        parameters=[
+            *EXPORT_PARAMETERS,
+            OpenApiParameter(
+                "departure",
+                type=OpenApiTypes.DATE,
+                description="Filter by departure date "
+                            "(ex. ?departure=2023-08-24)",
+            ),
+        ],
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["GET"], url_path="trips")
+    def trips(self, request) -> StreamingHttpResponse:
+        return self.export(
+            filter_trips(Trip.objects.all(), request.query_params),
+            (
+                "id",
+                "route_id",
+                "route__name",
+                "train_id",
+                "departure_time",
+                "arrival_time",
+                "sold_seats",
+            ),
+            "trips",
+        )
+
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["GET"], url_path="tickets")
+    def tickets(self, request) -> StreamingHttpResponse:
+        return self.export(
+            Ticket.objects.all(),
+            (
+                "id",
+                "order_id",
+                "order__user_id",
+                "trip_id",
+                "seat",
+                "luggage_weight",
+            ),
+            "tickets",
+        )
+
+    @extend_schema(
+        parameters=EXPORT_PARAMETERS,
+        responses={(200, "application/x-ndjson"): OpenApiTypes.STR},
+    )
+    @action(detail=False, methods=["GET"], url_path="orders")
+    def orders(self, request) -> StreamingHttpResponse:
+        return self.export(
+            Order.objects.all(),
+            ("id", "user_id", "user__email", "created_at"),
+            "orders",
+        )
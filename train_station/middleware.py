@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger("train_station.requests")
+
+current_timings = ContextVar("current_timings", default=None)
+
+
+class RequestTimings:
+    def __init__(self, worst_queries, time_serializers=False) -> None:
+        self.worst_queries = worst_queries
+        self.time_serializers = time_serializers
+        self.queries = 0
+        self.db_ms = 0.0
+        self.serializer_ms = 0.0
+        self.serializing = False
+        self.slowest = []
+        self.sequence = itertools.count()
+
+    def add_query(self, sql, duration) -> None:
+        self.queries += 1
+        self.db_ms += duration
+        if self.worst_queries:
+            entry = (duration, next(self.sequence), sql)
+            if len(self.slowest) < self.worst_queries:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+    def server_timing(self, total_ms) -> str:
+        metrics = [f'db;dur={self.db_ms:.2f};desc="{self.queries} queries"']
+        if self.time_serializers:
+            metrics.append(f"serializer;dur={self.serializer_ms:.2f}")
+        metrics.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, (time.perf_counter() - started) * 1000)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    """Keep ``record_query`` on every connection for good.
+
+    Async views run their queries on ``sync_to_async`` threads, each with
+    its own connection, so a wrapper entered around the request would miss
+    them. The context variable does follow the request into those threads.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_serializer_timer() -> None:
+    """Time top-level ``serializer.data`` calls of the current request.
+
+    ``Serializer.data`` and ``ListSerializer.data`` both go through
+    ``BaseSerializer.data``, so wrapping it once covers every serializer.
+    Nested serializers render through ``to_representation`` and are
+    counted as part of their parent. This replaces the property for the
+    whole process, it is only installed with ``REQUEST_TIMING_SERIALIZERS``.
+    """
+    original = BaseSerializer.data.fget
+    if getattr(original, "timed", False):
+        return
+
+    def data(serializer):
+        timings = current_timings.get()
+        if timings is None or timings.serializing:
+            return original(serializer)
+
+        timings.serializing = True
+        started = time.perf_counter()
+        try:
+            return original(serializer)
+        finally:
+            timings.serializer_ms += (time.perf_counter() - started) * 1000
+            timings.serializing = False
+
+    data.timed = True
+    BaseSerializer.data = property(data)
+
+
+class RequestTimingMiddleware:
+    """Report query count, DB, serializer and total time of each request.
+
+    The numbers go out as a ``Server-Timing`` header. Requests slower than
+    ``REQUEST_TIMING_SLOW_MS`` are logged together with their
+    ``REQUEST_TIMING_WORST_QUERIES`` slowest SQL statements. Serializer
+    time is measured only when ``REQUEST_TIMING_SERIALIZERS`` is set.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_TIMING_SLOW_MS
+        self.worst_queries = settings.REQUEST_TIMING_WORST_QUERIES
+        self.time_serializers = settings.REQUEST_TIMING_SERIALIZERS
+        if self.time_serializers:
+            install_serializer_timer()
+        connection_created.connect(install_query_recorder)
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings = RequestTimings(self.worst_queries, self.time_serializers)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    async def __acall__(self, request):
+        timings = RequestTimings(self.worst_queries, self.time_serializers)
+        token = current_timings.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, started)
+
+    def finish(self, request, response, timings, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        response["Server-Timing"] = timings.server_timing(total_ms)
+        if total_ms >= self.slow_ms:
+            self.log_slow_request(request, response, timings, total_ms)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, response, timings, total_ms) -> None:
+        statements = "".join(
+            f"\n  {duration:.2f} ms: {sql}"
+            for duration, _, sql in sorted(timings.slowest, reverse=True)
+        )
+        serializer = (
+            f", serializer {timings.serializer_ms:.2f} ms"
+            if timings.time_serializers
+            else ""
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.2f ms total, %d queries in "
+            "%.2f ms%s%s",
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            total_ms,
+            timings.queries,
+            timings.db_ms,
+            serializer,
+            statements,
+        )
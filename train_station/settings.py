@@ -9,10 +9,12 @@ https://docs.djangoproject.com/en/4.2/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
+import hashlib
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -46,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "train_station.middleware.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -86,6 +89,52 @@ DATABASES = {
     }
 }
 
+# Catalog versions, reference rows and token users are invalidated through
+# the cache, so it has to be shared by all worker processes. The file cache
+# covers one host, point CACHE_BACKEND and CACHE_LOCATION at Redis or
+# Memcached when workers run on several. Keys are prefixed per database,
+# a user id or catalog version of one database must not leak into another.
+CACHE_BACKEND = config(
+    "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+)
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": config("CACHE_LOCATION", str(BASE_DIR / "cache")),
+        "KEY_PREFIX": config(
+            "CACHE_KEY_PREFIX",
+            "train_station-"
+            + hashlib.sha1(
+                str(DATABASES["default"]["NAME"]).encode()
+            ).hexdigest()[:8],
+        ),
+    }
+}
+if CACHE_BACKEND.endswith(".FileBasedCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": 10000}
+
+# Read replicas for trip, route and station reads, ex.
+# DATABASE_REPLICAS=replica.sqlite3 with a copy of db.sqlite3 as stand-in
+REPLICA_DATABASES = []
+for number, name in enumerate(
+    config("DATABASE_REPLICAS", default="", cast=Csv()), start=1
+):
+    DATABASES[f"replica{number}"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / name,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica{number}")
+
+DATABASE_ROUTERS = ["train.replicas.ReplicaRouter"]
+
+# Seconds a client reads from the primary after writing
+REPLICA_PIN_SECONDS = config("REPLICA_PIN_SECONDS", 10, cast=int)
+
+
+# Tests get a cache of their own, see train_station.test_runner
+TEST_RUNNER = "train_station.test_runner.TestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -112,16 +161,29 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "user.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "train_station.throttling.AnonBucketThrottle",
+        "train_station.throttling.UserBucketThrottle",
+        "train_station.throttling.ScopedBucketThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "300/day", "user": "1000/day"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": "300/day",
+        "user": "1000/day",
+        "booking": config("BOOKING_THROTTLE_RATE", "100/hour"),
+    },
 }
 
+# Memory-mapped file shared by all workers holding the throttle buckets,
+# each slot takes 24 bytes
+THROTTLE_STORE_PATH = config(
+    "THROTTLE_STORE_PATH",
+    os.path.join(tempfile.gettempdir(), "train_station_throttle"),
+)
+THROTTLE_STORE_SLOTS = config("THROTTLE_STORE_SLOTS", 65536, cast=int)
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Train Station API",
     "DESCRIPTION": "Order train tickets",
@@ -155,6 +217,13 @@ STATIC_URL = "static/"
 
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Uploaded files never change under the same name, cache them for a year
+MEDIA_CACHE_SECONDS = config("MEDIA_CACHE_SECONDS", 31536000, cast=int)
+# Serve MEDIA_ROOT from Django, meant for development. In production the
+# web server serves media/ and sends the same Cache-Control header.
+SERVE_MEDIA = config("SERVE_MEDIA", bool(DEBUG), cast=bool)
+# Threads generating station image thumbnails in each process
+IMAGE_WORKERS = config("IMAGE_WORKERS", 2, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -163,6 +232,46 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "user.User"
 
+# Requests slower than this are logged with their slowest SQL statements
+REQUEST_TIMING_SLOW_MS = config("REQUEST_TIMING_SLOW_MS", 500, cast=int)
+REQUEST_TIMING_WORST_QUERIES = config(
+    "REQUEST_TIMING_WORST_QUERIES", 3, cast=int
+)
+# Also time serializer.data, this wraps DRF's BaseSerializer.data property
+# for the whole process, so it is meant for development and profiling
+REQUEST_TIMING_SERIALIZERS = config(
+    "REQUEST_TIMING_SERIALIZERS", bool(DEBUG), cast=bool
+)
+
+# Seconds a seat stays reserved for the user who held it
+SEAT_HOLD_TTL = config("SEAT_HOLD_TTL", 300, cast=int)
+# Seats one user can hold on a trip at a time
+SEAT_HOLD_MAX_SEATS = config("SEAT_HOLD_MAX_SEATS", 10, cast=int)
+# Seconds after which a hold can no longer be extended
+SEAT_HOLD_MAX_LIFETIME = config("SEAT_HOLD_MAX_LIFETIME", 1800, cast=int)
+# Reject tickets for seats the ordering user has not held first
+SEAT_HOLD_REQUIRED = config("SEAT_HOLD_REQUIRED", False, cast=bool)
+
+# Trains, train types, routes and stations kept in each process
+REFERENCE_CACHE_SIZE = config("REFERENCE_CACHE_SIZE", 4096, cast=int)
+
+# Background jobs: threads of the in-process pool and of run_jobs, whether
+# requests start their jobs right after commit, and retries with backoff
+JOB_WORKERS = config("JOB_WORKERS", 4, cast=int)
+JOB_RUN_IN_PROCESS = config("JOB_RUN_IN_PROCESS", True, cast=bool)
+JOB_MAX_ATTEMPTS = config("JOB_MAX_ATTEMPTS", 5, cast=int)
+JOB_RETRY_DELAY = config("JOB_RETRY_DELAY", 30, cast=int)
+JOB_RETRY_MAX_DELAY = config("JOB_RETRY_MAX_DELAY", 60 * 60, cast=int)
+# Seconds after which a running job is considered lost with its worker
+JOB_TIMEOUT = config("JOB_TIMEOUT", 10 * 60, cast=int)
+
+EMAIL_BACKEND = config(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+# Seconds a token's user is served from the cache instead of the database
+USER_CACHE_TTL = config("USER_CACHE_TTL", 60, cast=int)
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=300),  # default = 5
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),  # default = 1
@@ -0,0 +1,31 @@
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """Run the tests against a temporary file cache.
+
+    Tests clear the cache, with the project cache that would wipe the
+    entries of a server running next to them.
+    """
+
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased"
+                               ".FileBasedCache",
+                    "LOCATION": self.cache_dir.name,
+                }
+            }
+        )
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs) -> None:
+        self.cache_settings.disable()
+        self.cache_dir.cleanup()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,42 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework import serializers
+from rest_framework.serializers import BaseSerializer
+
+from train_station.middleware import RequestTimingMiddleware
+
+
+class NameSerializer(serializers.Serializer):
+    name = serializers.CharField()
+
+
+def view(request) -> HttpResponse:
+    NameSerializer({"name": "Lviv"}).data
+    return HttpResponse()
+
+
+class RequestTimingMiddlewareTests(SimpleTestCase):
+    def setUp(self) -> None:
+        original = BaseSerializer.__dict__["data"]
+        self.addCleanup(setattr, BaseSerializer, "data", original)
+
+    def get(self) -> HttpResponse:
+        return RequestTimingMiddleware(view)(RequestFactory().get("/"))
+
+    @override_settings(REQUEST_TIMING_SERIALIZERS=False)
+    def test_serializers_are_not_patched_by_default(self) -> None:
+        original = BaseSerializer.data
+
+        response = self.get()
+
+        self.assertIs(BaseSerializer.data, original)
+        self.assertNotIn("serializer;", response["Server-Timing"])
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+    @override_settings(REQUEST_TIMING_SERIALIZERS=True)
+    def test_serializer_timing(self) -> None:
+        response = self.get()
+
+        self.assertTrue(BaseSerializer.data.fget.timed)
+        self.assertIn("serializer;dur=", response["Server-Timing"])
+        self.assertEqual(NameSerializer({"name": "Kyiv"}).data["name"], "Kyiv")
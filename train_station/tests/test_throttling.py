@@ -0,0 +1,143 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from train_station.throttling import BucketStore, ScopedBucketThrottle
+
+
+class BucketStoreTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "buckets")
+        self.store = self.make_store()
+
+    def make_store(self, slots=64) -> BucketStore:
+        store = BucketStore(self.path, slots)
+        self.addCleanup(self.close, store)
+        return store
+
+    @staticmethod
+    def close(store) -> None:
+        if store.map is not None:
+            store.map.close()
+            os.close(store.fd)
+
+    def test_new_bucket_starts_full(self) -> None:
+        self.assertEqual(self.store.take("a", 10, 1, 1, now=100), (True, 9))
+
+    def test_cost_is_taken_only_when_available(self) -> None:
+        self.assertEqual(self.store.take("a", 10, 1, 4, now=100), (True, 6))
+        self.assertEqual(self.store.take("a", 10, 1, 7, now=100), (False, 6))
+        self.assertEqual(self.store.take("a", 10, 1, 6, now=100), (True, 0))
+
+    def test_refill_over_time(self) -> None:
+        self.store.take("a", 10, 0.5, 10, now=100)
+
+        self.assertEqual(
+            self.store.take("a", 10, 0.5, 2, now=103), (False, 1.5)
+        )
+        self.assertEqual(self.store.take("a", 10, 0.5, 2, now=104), (True, 0))
+
+    def test_refill_is_capped_at_capacity(self) -> None:
+        self.store.take("a", 10, 1, 5, now=100)
+
+        self.assertEqual(self.store.take("a", 10, 1, 1, now=10000), (True, 9))
+
+    def test_clock_going_back_adds_no_tokens(self) -> None:
+        self.store.take("a", 10, 1, 5, now=100)
+
+        self.assertEqual(self.store.take("a", 10, 1, 1, now=50), (True, 4))
+
+    def test_keys_have_separate_buckets(self) -> None:
+        self.store.take("a", 10, 1, 10, now=100)
+
+        self.assertEqual(self.store.take("b", 10, 1, 1, now=100), (True, 9))
+
+    def test_buckets_are_shared_through_the_file(self) -> None:
+        self.store.take("a", 10, 1, 4, now=100)
+
+        other = self.make_store()
+        self.assertEqual(other.take("a", 10, 1, 1, now=100), (True, 5))
+
+    def test_full_table_reuses_oldest_slot(self) -> None:
+        store = BucketStore(self.path + "-small", 1)
+        self.addCleanup(self.close, store)
+        store.take("a", 10, 1, 10, now=100)
+        store.take("b", 10, 1, 10, now=101)
+
+        self.assertEqual(store.take("a", 10, 1, 1, now=101), (True, 9))
+
+
+class ScopedBucketThrottleTests(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = BucketStore(os.path.join(directory.name, "buckets"), 64)
+        self.addCleanup(BucketStoreTests.close, store)
+
+        patchers = [
+            mock.patch("train_station.throttling.bucket_store", store),
+            mock.patch.dict(
+                ScopedBucketThrottle.THROTTLE_RATES, {"booking": "10/min"}
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.view = SimpleNamespace(
+            throttle_scope="booking", throttle_costs={"create": 5}
+        )
+
+    def check(self, method, action=None, now=100) -> ScopedBucketThrottle:
+        request = Request(getattr(APIRequestFactory(), method)("/"))
+        request.user = AnonymousUser()
+        self.view.action = action
+        throttle = ScopedBucketThrottle()
+        throttle.timer = lambda: now
+        throttle.allowed = throttle.allow_request(request, self.view)
+        return throttle
+
+    def test_action_cost(self) -> None:
+        self.assertTrue(self.check("post", "create").allowed)
+        self.assertTrue(self.check("post", "create").allowed)
+
+        throttle = self.check("post", "create")
+        self.assertFalse(throttle.allowed)
+        # 5 tokens at 10 tokens per 60 seconds
+        self.assertEqual(throttle.wait(), 30)
+
+    def test_default_cost(self) -> None:
+        for _ in range(10):
+            self.assertTrue(self.check("patch", "partial_update").allowed)
+
+        throttle = self.check("patch", "partial_update", now=103)
+        self.assertFalse(throttle.allowed)
+        self.assertAlmostEqual(throttle.wait(), 3)
+        self.assertTrue(self.check("patch", "partial_update", now=106).allowed)
+
+    def test_method_cost_without_action(self) -> None:
+        self.view.throttle_costs = {"post": 4}
+        self.check("post")
+        self.check("post")
+
+        self.assertEqual(self.check("post").tokens, 2)
+
+    def test_reads_are_not_limited(self) -> None:
+        for _ in range(20):
+            self.assertTrue(self.check("get", "list").allowed)
+        self.assertTrue(self.check("post", "create").allowed)
+
+    def test_cost_above_capacity_never_fits(self) -> None:
+        self.view.throttle_costs = {"create": 11}
+
+        throttle = self.check("post", "create")
+        self.assertFalse(throttle.allowed)
+        self.assertIsNone(throttle.wait())
@@ -0,0 +1,166 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import (
+    AnonRateThrottle,
+    ScopedRateThrottle,
+    UserRateThrottle,
+)
+
+# Key hash, tokens left, time of the last update.
+SLOT = struct.Struct("<Qdd")
+# Slots searched for a key before the least recently used one is reused.
+PROBES = 8
+
+
+class BucketStore:
+    """Fixed-size table of token buckets in a memory-mapped file.
+
+    Every worker process maps the same file, so limits hold across all of
+    them. A bucket takes one slot, found by open addressing on a hash of the
+    key, and the table never grows: when all probed slots are taken the one
+    updated longest ago is reused, which at worst hands a full bucket back
+    to an idle client. Updates are serialized with a lock on the file and a
+    thread lock for threads of the same process.
+    """
+
+    def __init__(self, path, slots) -> None:
+        self.path = path
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.map = None
+
+    def open(self) -> mmap.mmap:
+        if self.map is None:
+            size = self.slots * SLOT.size
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size < size:
+                os.ftruncate(self.fd, size)
+            self.map = mmap.mmap(self.fd, size)
+        return self.map
+
+    @staticmethod
+    def hash_key(key) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        # Zero marks an empty slot.
+        return int.from_bytes(digest, "little") or 1
+
+    def take(self, key, capacity, refill, cost, now) -> tuple[bool, float]:
+        """Take ``cost`` tokens from the bucket of ``key``.
+
+        The bucket holds up to ``capacity`` tokens and gains ``refill``
+        tokens per second. Returns whether the tokens were taken and how
+        many are left.
+        """
+        key_hash = self.hash_key(key)
+        with self.lock:
+            table = self.open()
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                index, tokens, updated = self.find(table, key_hash)
+                if tokens is None:
+                    tokens = capacity
+                else:
+                    tokens = min(
+                        capacity, tokens + max(now - updated, 0) * refill
+                    )
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                SLOT.pack_into(table, index * SLOT.size, key_hash, tokens, now)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+        return allowed, tokens
+
+    def find(self, table, key_hash) -> tuple:
+        """``(slot, tokens, updated)`` of the key, tokens are ``None`` for
+        a new bucket."""
+        empty, oldest = None, None
+        for probe in range(PROBES):
+            index = (key_hash + probe) % self.slots
+            owner, tokens, updated = SLOT.unpack_from(
+                table, index * SLOT.size
+            )
+            if owner == key_hash:
+                return index, tokens, updated
+            if not owner:
+                empty = index if empty is None else empty
+            elif oldest is None or updated < oldest[1]:
+                oldest = (index, updated)
+        return empty if empty is not None else oldest[0], None, None
+
+
+bucket_store = BucketStore(
+    settings.THROTTLE_STORE_PATH, settings.THROTTLE_STORE_SLOTS
+)
+
+
+def get_throttle_cost(request, view) -> int:
+    """Tokens a request takes from ``view.throttle_costs``, keyed by the
+    viewset action or the lowercase HTTP method, 1 by default."""
+    costs = getattr(view, "throttle_costs", {})
+    action = getattr(view, "action", None) or request.method.lower()
+    return costs.get(action, 1)
+
+
+class TokenBucketMixin:
+    """Rate throttle backed by ``bucket_store`` instead of the cache.
+
+    The rate sets the bucket size and how fast it refills, so ``100/hour``
+    allows bursts of 100 requests and one more every 36 seconds. Each
+    check is a single fixed-size slot update instead of rewriting a list of
+    timestamps.
+    """
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.cost = get_throttle_cost(request, view)
+        self.now = self.timer()
+        allowed, self.tokens = bucket_store.take(
+            self.key,
+            self.num_requests,
+            self.num_requests / self.duration,
+            self.cost,
+            self.now,
+        )
+        return allowed
+
+    def wait(self) -> float | None:
+        if self.cost > self.num_requests:
+            return None
+        return (self.cost - self.tokens) * self.duration / self.num_requests
+
+
+class AnonBucketThrottle(TokenBucketMixin, AnonRateThrottle):
+    pass
+
+
+class UserBucketThrottle(TokenBucketMixin, UserRateThrottle):
+    pass
+
+
+class ScopedBucketThrottle(TokenBucketMixin, ScopedRateThrottle):
+    """Extra limit on writes to views with a ``throttle_scope``.
+
+    Reads stay under the anon/user limits only, so listing orders does not
+    use up the bookings a client has left.
+    """
+
+    def allow_request(self, request, view) -> bool:
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope or request.method in SAFE_METHODS:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
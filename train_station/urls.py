@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.conf import settings
-from django.conf.urls.static import static
-from django.urls import path, include
+from django.urls import path, re_path, include
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
 
 from drf_spectacular.views import (
     SpectacularAPIView,
@@ -25,4 +26,19 @@ urlpatterns = [
         SpectacularRedocView.as_view(url_name="schema"),
         name="redoc",
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.SERVE_MEDIA:
+    # ``static()`` would serve nothing with SERVE_MEDIA on and DEBUG off.
+    urlpatterns.append(
+        re_path(
+            r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"),
+            cache_control(
+                public=True,
+                max_age=settings.MEDIA_CACHE_SECONDS,
+                immutable=True,
+            )(serve),
+            {"document_root": settings.MEDIA_ROOT},
+            name="media",
+        )
+    )
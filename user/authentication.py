@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def user_cache_key(user_id) -> str:
+    return f"jwt-user:{user_id}"
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT authentication that keeps token users in the cache.
+
+    The user row is cached for ``USER_CACHE_TTL`` seconds under the token's
+    user id, so authenticated requests skip the user query. The password
+    hash is left out of the cache, it is loaded on first access. The user
+    signals drop the entry whenever the user is saved or deleted, which
+    only reaches every worker through a shared cache, see
+    ``user.checks``. ``USER_CACHE_TTL = 0`` turns the cache off.
+    """
+
+    def get_user(self, validated_token):
+        if not settings.USER_CACHE_TTL:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+        fields = [
+            field.attname
+            for field in self.user_model._meta.concrete_fields
+            if field.name != "password"
+        ]
+        values = cache.get(user_cache_key(user_id))
+        if values is not None:
+            return self.user_model.from_db(DEFAULT_DB_ALIAS, fields, values)
+
+        user = super().get_user(validated_token)
+        cache.set(
+            user_cache_key(user_id),
+            [getattr(user, field) for field in fields],
+            settings.USER_CACHE_TTL,
+        )
+        return user
+
+
+class CachedJWTScheme(SimpleJWTScheme):
+    """Document ``CachedJWTAuthentication`` like plain JWT bearer auth."""
+
+    target_class = "user.authentication.CachedJWTAuthentication"
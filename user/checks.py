@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCAL_CACHE = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches)
+def check_user_cache(app_configs, **kwargs) -> list:
+    """Cached token users carry ``is_active`` and ``is_staff``, a worker
+    must not keep them after another worker changed the user."""
+    if settings.USER_CACHE_TTL and (
+        settings.CACHES["default"]["BACKEND"] == LOCAL_CACHE
+    ):
+        return [
+            Error(
+                "USER_CACHE_TTL needs a cache shared by all workers, the "
+                "local memory cache would keep revoked permissions.",
+                hint="Use a file, Redis or Memcached cache, or set "
+                "USER_CACHE_TTL=0.",
+                id="user.E001",
+            )
+        ]
+    return []